@@ -0,0 +1,105 @@
+"""
+Compares converting a large generated schema to plain data with a json round trip, and with ``to_plain_data``.
+
+Builds a URLconf with many views and serializers, generates its schema with drf-spectacular and drf-yasg, and
+reports the time and peak memory of each conversion. Run from the repository root with
+``python benchmarks/generated_schema_loading.py``.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import time
+import tracemalloc
+import types
+import warnings
+from json import dumps, loads
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "test_project.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.test import override_settings  # noqa: E402
+from django.urls import path  # noqa: E402
+from django.utils.translation import gettext_lazy  # noqa: E402
+from rest_framework import generics, serializers  # noqa: E402
+
+from openapi_tester.loaders import DrfSpectacularSchemaLoader, DrfYasgSchemaLoader  # noqa: E402
+from openapi_tester.utils import to_plain_data  # noqa: E402
+from test_project.models import Names  # noqa: E402
+
+ENDPOINTS = 900
+FIELDS = 20
+
+
+def build_urlconf(endpoints: int, fields: int) -> str:
+    module = types.ModuleType("generated_schema_urls")
+    urlpatterns = []
+    for index in range(endpoints):
+        serializer = type(
+            f"Item{index}Serializer",
+            (serializers.Serializer,),
+            {
+                "__module__": module.__name__,
+                **{
+                    f"field_{field}": serializers.CharField(help_text=gettext_lazy("A generated field"))
+                    for field in range(fields)
+                },
+            },
+        )
+        view = type(
+            f"Item{index}View",
+            (generics.RetrieveAPIView,),
+            {"__module__": module.__name__, "serializer_class": serializer, "queryset": Names.objects.all()},
+        )
+        urlpatterns.append(path(f"api/items-{index}/<int:pk>/", view.as_view()))
+    module.urlpatterns = urlpatterns  # type: ignore[attr-defined]
+    sys.modules[module.__name__] = module
+    return module.__name__
+
+
+def measure(convert, generated) -> tuple[float, float]:
+    """
+    Returns the time a conversion takes, and the peak memory it allocates on top of the generated schema, in MiB.
+    """
+    start = time.perf_counter()
+    convert(generated)
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    converted = convert(generated)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del converted
+    return seconds, peak / 2**20
+
+
+def main() -> None:
+    warnings.simplefilter("ignore")
+    conversions = {
+        "json round trip": lambda generated: loads(dumps(generated)),
+        "to_plain_data": to_plain_data,
+    }
+    with override_settings(ROOT_URLCONF=build_urlconf(ENDPOINTS, FIELDS)):
+        generators = {
+            "drf-spectacular": lambda: DrfSpectacularSchemaLoader().schema_generator.get_schema(public=True),
+            # the json round trip was applied to the OrderedDict tree returned by as_odict
+            "drf-yasg": lambda: DrfYasgSchemaLoader().schema_generator.get_schema(None, True),
+        }
+        for name, generate in generators.items():
+            start = time.perf_counter()
+            generated = generate()
+            print(f"{name}: {ENDPOINTS} endpoints, generated in {time.perf_counter() - start:.1f} s")
+            for conversion_name, convert in conversions.items():
+                if name == "drf-yasg" and conversion_name == "json round trip":
+                    seconds, peak = measure(lambda schema: convert(schema.as_odict()), generated)
+                else:
+                    seconds, peak = measure(convert, generated)
+                print(f"  {conversion_name:>15}: {seconds * 1000:8.1f} ms, peak {peak:6.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
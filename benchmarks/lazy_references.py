@@ -0,0 +1,99 @@
+"""
+Compares loading schemas, up to validating the first response, with and without ``OPENAPI_TESTER_LAZY_REFERENCES``.
+
+Uses two vendor specs from the sample corpus, and a generated spec with 4000 operations. Run from the repository root
+with ``python benchmarks/lazy_references.py``.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "test_project.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.test import override_settings  # noqa: E402
+
+from openapi_tester.loaders import StaticSchemaLoader, schema_registry  # noqa: E402
+
+CORPUS = Path(__file__).resolve().parent.parent / "tests" / "schemas" / "sample-schemas" / "external-apis"
+OPERATIONS = 4000
+
+
+def build_schema(operations: int) -> dict:
+    schemas: dict = {
+        "Page": {"type": "object", "properties": {"next": {"type": "string", "nullable": True}}},
+        "Owner": {"type": "object", "properties": {"name": {"type": "string"}, "email": {"type": "string"}}},
+    }
+    paths = {}
+    for index in range(operations):
+        schemas[f"Item{index}"] = {
+            "allOf": [
+                {"$ref": "#/components/schemas/Page"},
+                {
+                    "type": "object",
+                    "properties": {
+                        **{f"field_{field}": {"type": "string", "maxLength": 20} for field in range(10)},
+                        "owner": {"$ref": "#/components/schemas/Owner"},
+                    },
+                },
+            ]
+        }
+        paths[f"/items-{index}/"] = {
+            "get": {
+                "responses": {
+                    "200": {
+                        "description": "",
+                        "content": {"application/json": {"schema": {"$ref": f"#/components/schemas/Item{index}"}}},
+                    }
+                }
+            }
+        }
+    return {
+        "openapi": "3.0.3",
+        "info": {"title": "", "version": ""},
+        "paths": paths,
+        "components": {"schemas": schemas},
+    }
+
+
+class BenchmarkLoader(StaticSchemaLoader):
+    def normalize_schema_paths(self, schema: dict) -> dict:
+        # the paths are not routes of the test project
+        return schema
+
+
+def load(path: str) -> float:
+    """
+    Returns the time it takes to load a schema, and resolve the schema of its first indexed response.
+    """
+    schema_registry.clear()
+    start = time.perf_counter()
+    loader = BenchmarkLoader(path)
+    index = loader.sections.get_response_schema_index(loader.get_schema())
+    if index:
+        loader.sections.resolve(next(iter(index.values())))
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        generated = Path(directory) / "generated.json"
+        generated.write_text(json.dumps(build_schema(OPERATIONS)))
+        for path in [CORPUS / "istat-sdmx-rest.yaml", CORPUS / "siopeplus.yaml", generated]:
+            eager = load(str(path))
+            with override_settings(OPENAPI_TESTER_LAZY_REFERENCES=True):
+                lazy = load(str(path))
+            print(f"{path.name:<25} eager {eager * 1000:9.1f} ms, lazy {lazy * 1000:7.1f} ms ({eager / lazy:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
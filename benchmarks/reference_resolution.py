@@ -0,0 +1,129 @@
+"""
+Compares de-referencing a component-heavy schema with prance, the way schemas used to be de-referenced, and with
+``ReferenceResolver``; and validating the de-referenced schema against the OpenAPI specification, as it used to be
+validated, with validating the schema as it is.
+
+The generated schema has operations that share components, some of them recursive. prance is a development dependency.
+Run from the repository root with ``python benchmarks/reference_resolution.py``.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import time
+import tracemalloc
+import warnings
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "test_project.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from prance.util.resolver import RefResolver  # noqa: E402
+
+from openapi_tester.loaders import BaseSchemaLoader  # noqa: E402
+from openapi_tester.references import ReferenceResolver  # noqa: E402
+
+OPERATIONS = 300
+# validating the de-referenced schema takes exponential time in the depth recursive components are unrolled to
+VALIDATED_OPERATIONS = 1
+
+
+def build_schema(operations: int) -> dict:
+    schemas = {
+        "Category": {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string"},
+                "parent": {"$ref": "#/components/schemas/Category"},
+                "children": {"type": "array", "items": {"$ref": "#/components/schemas/Category"}},
+            },
+        },
+        "Owner": {
+            "type": "object",
+            "properties": {**{f"field_{field}": {"type": "string"} for field in range(20)}},
+        },
+        "Pet": {
+            "type": "object",
+            "properties": {
+                **{f"field_{field}": {"type": "string"} for field in range(20)},
+                "owner": {"$ref": "#/components/schemas/Owner"},
+                "category": {"$ref": "#/components/schemas/Category"},
+            },
+        },
+    }
+    paths = {
+        f"/pets-{index}/": {
+            "get": {
+                "responses": {
+                    "200": {
+                        "description": "",
+                        "content": {
+                            "application/json": {
+                                "schema": {"type": "array", "items": {"$ref": "#/components/schemas/Pet"}}
+                            }
+                        },
+                    }
+                }
+            }
+        }
+        for index in range(operations)
+    }
+    return {
+        "openapi": "3.0.3",
+        "info": {"title": "", "version": ""},
+        "paths": paths,
+        "components": {"schemas": schemas},
+    }
+
+
+def de_reference_with_prance(schema: dict) -> dict:
+    def handle_recursion_limit(iteration, parse_result, recursions):
+        definition = schema
+        for key in [key for key in parse_result.fragment.split("/") if key]:
+            definition = definition[key]
+        return definition
+
+    resolver = RefResolver(schema, recursion_limit_handler=handle_recursion_limit, recursion_limit=10, url="/")
+    resolver.resolve_references()
+    return resolver.specs
+
+
+def de_reference_with_resolver(schema: dict) -> dict:
+    return ReferenceResolver(schema).resolve(schema)
+
+
+def measure(function, *args) -> tuple[object, float, float]:
+    """
+    Returns the result of a function, the time it takes, and the memory its result holds on to, in MiB.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function(*args)
+    seconds = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, size / 2**20
+
+
+def main() -> None:
+    warnings.simplefilter("ignore")
+    print(f"{OPERATIONS} operations")
+    prance_schema, prance_seconds, prance_size = measure(de_reference_with_prance, build_schema(OPERATIONS))
+    schema = build_schema(OPERATIONS)
+    _, resolver_seconds, resolver_size = measure(de_reference_with_resolver, schema)
+    print(f"  de-referencing with prance:   {prance_seconds * 1000:8.1f} ms, holding {prance_size:6.1f} MiB")
+    print(f"  de-referencing with resolver: {resolver_seconds * 1000:8.1f} ms, holding {resolver_size:6.1f} MiB")
+    print(f"{VALIDATED_OPERATIONS} operations")
+    prance_schema = de_reference_with_prance(build_schema(VALIDATED_OPERATIONS))
+    _, de_referenced_seconds, _ = measure(BaseSchemaLoader.validate_schema, prance_schema)
+    _, seconds, _ = measure(BaseSchemaLoader.validate_schema, build_schema(VALIDATED_OPERATIONS))
+    print(f"  validating the de-referenced schema: {de_referenced_seconds * 1000:8.1f} ms")
+    print(f"  validating the schema:               {seconds * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Compares parsing the bundled sample schemas the way static schemas used to be parsed - picking a parser by file
+extension, and parsing YAML with the pure python FullLoader - with ``parse_schema``.
+
+Run from the repository root with ``python benchmarks/schema_parsing.py``.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+import timeit
+from pathlib import Path
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "test_project.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from openapi_tester.parsers import JSON_DECODER, YamlLoader, parse_schema  # noqa: E402
+
+CORPUS = Path(__file__).resolve().parent.parent / "tests" / "schemas" / "sample-schemas"
+
+
+def parse_by_extension(path: Path) -> object:
+    with open(path, encoding="utf-8") as file:
+        content = file.read()
+    return json.loads(content) if ".json" in str(path) else yaml.load(content, Loader=yaml.FullLoader)
+
+
+def main() -> None:
+    decoder = f"{JSON_DECODER.__module__}.{JSON_DECODER.__name__}" if JSON_DECODER else "json.loads"
+    print(f"YAML loader: {YamlLoader.__name__}, JSON decoder: {decoder}")
+    totals = [0.0, 0.0]
+    for path in sorted(CORPUS.rglob("*.*")):
+        if path.suffix not in (".yaml", ".yml", ".json"):
+            continue
+        assert parse_schema(path.read_bytes()) == parse_by_extension(path)
+        old = min(timeit.repeat(lambda: parse_by_extension(path), number=3, repeat=3)) / 3
+        new = min(timeit.repeat(lambda: parse_schema(path.read_bytes()), number=3, repeat=3)) / 3
+        totals[0] += old
+        totals[1] += new
+        print(f"  {str(path.relative_to(CORPUS)):<60} {old * 1000:8.2f} ms -> {new * 1000:7.2f} ms ({old / new:4.1f}x)")
+    print(f"  {'total':<60} {totals[0] * 1000:8.2f} ms -> {totals[1] * 1000:7.2f} ms ({totals[0] / totals[1]:4.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
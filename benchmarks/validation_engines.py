@@ -0,0 +1,71 @@
+"""
+Compares the per-node overhead of the recursive and iterative validation engines.
+
+Run from the repository root with ``python benchmarks/validation_engines.py``.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "test_project.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from openapi_tester import SchemaTester  # noqa: E402
+
+item_schema = {
+    "type": "object",
+    "required": ["id", "name"],
+    "properties": {
+        "id": {"type": "integer"},
+        "name": {"type": "string"},
+        "price": {"type": "number", "minimum": 0},
+        "tags": {"type": "array", "items": {"type": "string"}},
+    },
+}
+list_schema = {"type": "array", "items": item_schema}
+tree_schema: dict = {"type": "object", "required": ["name"], "properties": {"name": {"type": "string"}}}
+tree_schema["properties"]["children"] = {"type": "array", "items": tree_schema}
+
+
+def build_tree(depth: int, width: int) -> dict:
+    if depth == 0:
+        return {"name": "leaf"}
+    return {"name": "node", "children": [build_tree(depth - 1, width) for _ in range(width)]}
+
+
+def count_nodes(data: object) -> int:
+    if isinstance(data, dict):
+        return 1 + sum(count_nodes(value) for value in data.values())
+    if isinstance(data, list):
+        return 1 + sum(count_nodes(value) for value in data)
+    return 1
+
+
+def main() -> None:
+    payloads = {
+        "list of 10k objects": (
+            list_schema,
+            [{"id": i, "name": "x", "price": 1.5, "tags": ["a", "b"]} for i in range(10_000)],
+        ),
+        "tree of depth 8, width 3": (tree_schema, build_tree(8, 3)),
+    }
+    for name, (schema_section, data) in payloads.items():
+        nodes = count_nodes(data)
+        print(f"{name} ({nodes} nodes)")
+        for engine in ("recursive", "iterative"):
+            schema_tester = SchemaTester()
+            schema_tester.engine = engine
+            plan = schema_tester.get_validation_plan(schema_section)
+            seconds = min(timeit.repeat(lambda: plan.validate(data), number=5, repeat=5)) / 5
+            print(f"  {engine:>9}: {seconds * 1000:8.2f} ms, {seconds / nodes * 1e9:6.0f} ns per node")
+
+
+if __name__ == "__main__":
+    main()
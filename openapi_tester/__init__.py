@@ -2,17 +2,27 @@
 from .case_testers import is_camel_case, is_kebab_case, is_pascal_case, is_snake_case
 from .clients import OpenAPIClient
 from .loaders import BaseSchemaLoader, DrfSpectacularSchemaLoader, DrfYasgSchemaLoader, StaticSchemaLoader
+from .sampling import SampleAll, SampleEdges, SampleFirst, SampleStride, SamplingPolicy, SamplingSummary
 from .schema_tester import SchemaTester
+from .validators import applies_to, register_format
 
 __all__ = [
     "BaseSchemaLoader",
     "DrfSpectacularSchemaLoader",
     "DrfYasgSchemaLoader",
+    "SampleAll",
+    "SampleEdges",
+    "SampleFirst",
+    "SampleStride",
+    "SamplingPolicy",
+    "SamplingSummary",
     "SchemaTester",
     "StaticSchemaLoader",
+    "applies_to",
     "is_camel_case",
     "is_kebab_case",
     "is_pascal_case",
     "is_snake_case",
+    "register_format",
     "OpenAPIClient",
 ]
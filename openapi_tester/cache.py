@@ -0,0 +1,179 @@
+""" Cache module - persistent, on-disk caching of processed schemas """
+from __future__ import annotations
+
+import hashlib
+import importlib.util
+import json
+import os
+import pickle
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from django.conf import settings
+
+if TYPE_CHECKING:
+    from typing import Any, Iterable
+
+# Entries are laid out as: magic bytes, sha256 checksum of the payload, pickled payload
+CACHE_MAGIC = b"OATC1\n"
+CHECKSUM_LENGTH = hashlib.sha256().digest_size
+
+
+def get_distribution_version(name: str) -> str:
+    try:
+        from importlib.metadata import PackageNotFoundError, version
+
+        try:
+            return version(name)
+        except PackageNotFoundError:
+            return "unknown"
+    except ImportError:  # pragma: no cover - python 3.7
+        return "unknown"
+
+
+@lru_cache(maxsize=None)
+def get_library_fingerprint() -> str:
+    """
+    Returns a fingerprint of the installed library: its version and a digest of its source files.
+
+    Including the sources means cache entries written by a different checkout of the library are never reused.
+    """
+    digest = hashlib.sha256(get_distribution_version("drf-openapi-tester").encode())
+    for source_file in sorted(Path(__file__).parent.glob("*.py")):
+        digest.update(source_file.read_bytes())
+    return digest.hexdigest()
+
+
+def hash_content(content: str | bytes) -> str:
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return hashlib.sha256(content).hexdigest()
+
+
+def _is_installed_package(path: Path) -> bool:
+    return any(part in ("site-packages", "dist-packages") for part in path.parts)
+
+
+def get_project_source_paths() -> list[Path]:
+    """
+    Returns the directories and files of the project's own code: the apps in ``INSTALLED_APPS`` that are not
+    installed packages, and the package or module of the root URLconf.
+    """
+    from django.apps import apps
+
+    paths = {Path(app_config.path) for app_config in apps.get_app_configs()}
+    root_urlconf = getattr(settings, "ROOT_URLCONF", None)
+    if root_urlconf:
+        spec = importlib.util.find_spec(root_urlconf.split(".")[0])
+        if spec is not None and spec.submodule_search_locations:
+            paths.update(Path(location) for location in spec.submodule_search_locations)
+        elif spec is not None and spec.origin:
+            paths.add(Path(spec.origin))
+    source_paths: list[Path] = []
+    for path in sorted(path.resolve() for path in paths):
+        if _is_installed_package(path) or any(parent in path.parents for parent in source_paths):
+            continue
+        source_paths.append(path)
+    return source_paths
+
+
+def _describe_setting(value: Any) -> Any:
+    if isinstance(value, (set, frozenset)):
+        return sorted(map(repr, value))
+    return f"{getattr(value, '__module__', '')}.{getattr(value, '__qualname__', type(value).__qualname__)}"
+
+
+def get_code_fingerprint(setting_names: Iterable[str], *components: str) -> str:
+    """
+    Returns a fingerprint of the code a schema is generated from: the sources of the project's apps and root
+    URLconf, as returned by get_project_source_paths, the values of the given settings, and any other components,
+    like the versions of the packages that generate the schema.
+
+    Source files are hashed by content, relative to their directory, so checkouts of the same code in different
+    locations have the same fingerprint.
+    """
+    digest = hashlib.sha256()
+    for component in components:
+        digest.update(f"{component}\n".encode())
+    for setting_name in sorted(setting_names):
+        value = getattr(settings, setting_name, None)
+        try:
+            description = json.dumps(value, sort_keys=True, default=_describe_setting)
+        except (TypeError, ValueError):
+            description = repr(value)
+        digest.update(f"{setting_name}={description}\n".encode())
+    for source_path in get_project_source_paths():
+        source_files = sorted(source_path.rglob("*.py")) if source_path.is_dir() else [source_path]
+        for source_file in source_files:
+            if _is_installed_package(source_file):
+                continue
+            digest.update(f"{source_file.relative_to(source_path.parent)}\n".encode())
+            digest.update(hash_content(source_file.read_bytes()).encode())
+    return digest.hexdigest()
+
+
+def get_cache_dir() -> str | None:
+    """
+    Returns the configured cache directory. Caching is opt-in, through the ``OPENAPI_TESTER_CACHE_DIR`` setting.
+    """
+    return getattr(settings, "OPENAPI_TESTER_CACHE_DIR", None)
+
+
+class SchemaCache:
+    """
+    Persistent cache of processed schemas.
+
+    Entries are keyed by the digest of the schema source and the library fingerprint, and stored as checksummed
+    pickles. Entries that cannot be read back - truncated, corrupted or written by an incompatible version - are
+    discarded, so the caller rebuilds them. The checksum only detects damaged entries: anyone who can write to the
+    cache directory can make it load arbitrary pickles, so the directory must be trusted.
+    """
+
+    def __init__(self, directory: str | os.PathLike) -> None:
+        self.directory = Path(directory)
+
+    def get_path(self, key: str) -> Path:
+        entry_name = hash_content(f"{get_library_fingerprint()}:{key}")
+        return self.directory / f"{entry_name}.schema"
+
+    def get(self, key: str) -> Any:
+        """
+        Returns the cached value for a key, or None when the entry is missing or invalid.
+        """
+        path = self.get_path(key)
+        try:
+            content = path.read_bytes()
+        except OSError:
+            return None
+        header_length = len(CACHE_MAGIC) + CHECKSUM_LENGTH
+        checksum, payload = content[len(CACHE_MAGIC) : header_length], content[header_length:]
+        if content[: len(CACHE_MAGIC)] == CACHE_MAGIC and hashlib.sha256(payload).digest() == checksum:
+            try:
+                return pickle.loads(payload)  # nosec - the cache directory is trusted
+            except Exception:  # pylint: disable=broad-except
+                pass
+        self.delete(key)
+        return None
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Writes an entry. The entry is written to a temporary file first, so readers never see partial entries.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "wb") as file:
+                file.write(CACHE_MAGIC + hashlib.sha256(payload).digest() + payload)
+            os.replace(temporary_path, self.get_path(key))
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+
+    def delete(self, key: str) -> None:
+        try:
+            self.get_path(key).unlink()
+        except OSError:
+            pass
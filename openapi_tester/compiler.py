@@ -0,0 +1,570 @@
+""" Compiler module - turns schema sections into reusable validation plans """
+from __future__ import annotations
+
+from functools import partial
+from itertools import chain
+from typing import TYPE_CHECKING
+
+from openapi_tester.constants import (
+    VALIDATE_ANY_OF_ERROR,
+    VALIDATE_EXCESS_RESPONSE_KEY_ERROR,
+    VALIDATE_MISSING_RESPONSE_KEY_ERROR,
+    VALIDATE_NONE_ERROR,
+    VALIDATE_ONE_OF_ERROR,
+    VALIDATE_WRITE_ONLY_RESPONSE_KEY_ERROR,
+)
+from openapi_tester.exceptions import DocumentationError, OpenAPISchemaError
+from openapi_tester.sampling import SampleAll
+from openapi_tester.utils import merge_objects, normalize_schema_section, render_reference, resolve_fragment
+from openapi_tester.validators import (
+    applies_to_section,
+    validate_enum,
+    validate_format,
+    validate_max_items,
+    validate_max_length,
+    validate_max_properties,
+    validate_maximum,
+    validate_min_items,
+    validate_min_length,
+    validate_min_properties,
+    validate_minimum,
+    validate_multiple_of,
+    validate_pattern,
+    validate_type,
+    validate_unique_items,
+)
+
+if TYPE_CHECKING:
+    from typing import Any, Callable, Collection, Iterator, Sequence
+
+    from openapi_tester.sampling import SamplingPolicy
+    from openapi_tester.schema_tester import SchemaTester
+    from openapi_tester.utils import Reference
+
+# Built-in validators in the order they are applied. Each validator declares the schema keywords it reacts to, and
+# is only bound for sections that contain them.
+BUILT_IN_VALIDATORS: tuple[Callable[[dict, Any], str | None], ...] = (
+    validate_type,
+    validate_format,
+    validate_pattern,
+    validate_multiple_of,
+    validate_minimum,
+    validate_maximum,
+    validate_unique_items,
+    validate_min_length,
+    validate_max_length,
+    validate_min_items,
+    validate_max_items,
+    validate_max_properties,
+    validate_min_properties,
+    validate_enum,
+)
+
+# Validation engines: the recursive engine validates sub-sections with nested calls, and the iterative engine walks
+# the data with an explicit stack, so it can validate data of any depth
+RECURSIVE_ENGINE = "recursive"
+ITERATIVE_ENGINE = "iterative"
+ENGINES = (RECURSIVE_ENGINE, ITERATIVE_ENGINE)
+
+# The number of distinct key sets each object plan remembers as valid
+MAX_MEMOIZED_SHAPES = 256
+
+
+# the compiler holds its configuration, plus the memos of the sections it processed
+class SchemaCompiler:  # pylint: disable=too-many-instance-attributes
+    """
+    Compiles schema sections into validation plans for a single tester configuration.
+
+    Plans are memoized per schema section, so a section that is reachable from several places is compiled once.
+    """
+
+    def __init__(
+        self,
+        tester: SchemaTester,
+        case_tester: Callable[[str], None] | None = None,
+        ignore_case: Collection[str] = (),
+        validators: Sequence[Callable[[dict, Any], str | None]] = (),
+        *,
+        sampling: SamplingPolicy | None = None,
+        engine: str = RECURSIVE_ENGINE,
+    ) -> None:
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown validation engine {engine!r}, expected one of: {', '.join(ENGINES)}")
+        self.tester = tester
+        self.case_tester = case_tester
+        self.ignore_case = frozenset(ignore_case)
+        self.verified_keys = tester.get_verified_keys(case_tester) if case_tester else None
+        self.validators = tuple(validators)
+        self.sampling = sampling or SampleAll()
+        self.engine = engine
+        self.normalized_sections: dict[int, tuple[dict, dict]] = {}
+        self._plans: dict[int, ValidationPlan] = {}
+        self._casing_tested_sections: dict[int, dict] = {}
+
+    def compile(
+        self, schema_section: dict, validators: Sequence[Callable[[dict, Any], str | None]] = ()
+    ) -> ValidationPlan:
+        """
+        Returns the validation plan of a schema section.
+
+        :param schema_section: The schema section to compile
+        :param validators: Additional validators that only apply to this section, not to its sub-sections
+        """
+        plan_class = PLAN_CLASSES[self.engine]
+        if validators:
+            return plan_class(self, schema_section, validators)
+        plan = self._plans.get(id(schema_section))
+        if plan is None:
+            # the plan keeps a reference to its section, so the id cannot be reused while it's cached
+            plan = self._plans[id(schema_section)] = plan_class(self, schema_section)
+        return plan
+
+    def compile_schema(
+        self, schema_section: dict, validators: Sequence[Callable[[dict, Any], str | None]] = ()
+    ) -> ValidationPlan:
+        """
+        Returns the validation plan of a schema section that data is validated against, after testing the casing of
+        the property names in the section.
+        """
+        self.test_schema_casing(schema_section)
+        return self.compile(schema_section, validators)
+
+    def test_schema_casing(self, schema_section: dict) -> None:
+        """
+        Tests the casing of the property names in a schema section and all of its sub-sections.
+
+        Sections are only tested once, so at validation time only the keys of the data need to be tested.
+        """
+        if not self.case_tester or id(schema_section) in self._casing_tested_sections:
+            return
+        pending = [schema_section]
+        visited: set[int] = set()
+        while pending:
+            section = pending.pop()
+            if not isinstance(section, dict) or id(section) in visited:
+                continue
+            visited.add(id(section))
+            properties = section.get("properties")
+            if isinstance(properties, dict):
+                for key, property_section in properties.items():
+                    self.test_key_casing(key)
+                    pending.append(property_section)
+            for keyword in ("items", "additionalProperties", "not"):
+                if isinstance(section.get(keyword), dict):
+                    pending.append(section[keyword])
+            for keyword in ("allOf", "oneOf", "anyOf"):
+                if isinstance(section.get(keyword), list):
+                    pending.extend(section[keyword])
+        # the section is kept, so its id cannot be reused while it's cached
+        self._casing_tested_sections[id(schema_section)] = schema_section
+
+    def test_key_casing(self, key: str) -> None:
+        if self.case_tester and key not in self.ignore_case and self.verified_keys.get(key) is None:  # type: ignore
+            self.case_tester(key)
+            self.verified_keys.set(key, True)  # type: ignore
+
+    def resolve_reference(self, reference: str) -> dict | None:
+        """
+        Returns the normalized schema section a reference points to in the loaded schema, if any.
+        """
+        schema = self.tester.loader.schema
+        if not schema:
+            return None
+        if not reference.startswith("#"):
+            # discriminator mappings can use plain schema names
+            reference = f"#/components/schemas/{reference}"
+        try:
+            section = resolve_fragment(schema, reference)
+        except (KeyError, IndexError, TypeError, ValueError):
+            return None
+        if not isinstance(section, dict):
+            return None
+        return normalize_schema_section(self.tester.loader.sections.resolve(section), self.normalized_sections)
+
+
+# plans hold the rules precomputed for their section, which are read on every validation
+class ValidationPlan:  # pylint: disable=too-many-instance-attributes
+    """
+    A schema section compiled into the checks that apply to it.
+
+    Only the validators whose keywords are present in the section are bound, and sub-plans are compiled
+    lazily, the first time data reaches them.
+    """
+
+    def __init__(
+        self,
+        compiler: SchemaCompiler,
+        schema_section: dict,
+        validators: Sequence[Callable[[dict, Any], str | None]] = (),
+    ) -> None:
+        self.compiler = compiler
+        self.schema_section = schema_section
+        # sections of loaded schemas are normalized at load time, in which case this is a lookup with no copying
+        section = normalize_schema_section(schema_section, compiler.normalized_sections)
+        self.section = section
+        self.nullable = compiler.tester.test_is_nullable(schema_section) or compiler.tester.test_is_nullable(section)
+        self.checks: list[Callable[[Any], str | None]] = []
+        self._object_rules: tuple | None = None
+        self._discriminator: tuple[str, dict[str, dict]] | None = None
+        self._sub_plans: dict[int, ValidationPlan] = {}
+        self._merged_plans: dict[tuple[int, ...], ValidationPlan] = {}
+        self._valid_shapes: set[frozenset[str]] = set()
+        self.is_object = False
+        self.is_array = False
+
+        if "oneOf" in section:
+            self.validate_section = self.validate_one_of
+        elif "anyOf" in section:
+            self.validate_section = self.validate_any_of
+        else:
+            schema_type = compiler.tester.get_schema_type(section)
+            if not schema_type:
+                self.validate_section = self.validate_nothing
+                return
+            self.checks = [
+                partial(validator, section)
+                for validator in chain(BUILT_IN_VALIDATORS, compiler.validators, validators)
+                if applies_to_section(validator, section)
+            ]
+            if schema_type == "object":
+                self.validate_section = self.validate_typed_object
+                self.is_object = True
+            elif schema_type == "array":
+                self.validate_section = self.validate_typed_array
+                self.is_array = True
+            else:
+                self.validate_section = self.validate_checks
+
+    def sub_plan(self, schema_section: dict) -> ValidationPlan:
+        plan = self._sub_plans.get(id(schema_section))
+        if plan is None:
+            plan = self._sub_plans[id(schema_section)] = self.compiler.compile(schema_section)
+        return plan
+
+    def validate(self, data: Any, reference: Reference = "init") -> None:
+        """
+        Validates data against the plan.
+
+        :raises: ``openapi_tester.exceptions.DocumentationError`` for inconsistencies in the data and schema.
+        """
+        if data is None:
+            if self.nullable:
+                return
+            raise self.none_error(reference)
+        self.validate_section(data, reference)
+
+    @staticmethod
+    def none_error(reference: Reference) -> DocumentationError:
+        return DocumentationError(
+            f"{VALIDATE_NONE_ERROR}\n\n"
+            f"Reference: {render_reference(reference)}\n\n"
+            "Hint: Return a valid type, or document the value as nullable"
+        )
+
+    def validate_nothing(self, data: Any, reference: Reference) -> None:
+        pass
+
+    def validate_checks(self, data: Any, reference: Reference) -> None:
+        for check in self.checks:
+            error = check(data)
+            if error:
+                raise DocumentationError(f"\n\n{error}\n\nReference: {render_reference(reference)}")
+
+    def validate_typed_object(self, data: Any, reference: Reference) -> None:
+        self.validate_checks(data, reference)
+        self.validate_object(data, reference)
+
+    def validate_typed_array(self, data: Any, reference: Reference) -> None:
+        self.validate_checks(data, reference)
+        self.validate_array(data, reference)
+
+    @property
+    def discriminator(self) -> tuple[str, dict[str, dict]] | None:
+        """
+        Returns the discriminator property name of a oneOf section, and the oneOf option of each discriminator value.
+
+        Options are mapped from the discriminator's explicit mapping, from the enum of the discriminator property in
+        each option, and from the name of the component schema each option is. When some option cannot be mapped, the
+        discriminator is ignored, and options are tested exhaustively.
+        """
+        if self._discriminator is None:
+            self._discriminator = ("", {})
+            discriminator = self.section.get("discriminator")
+            if not isinstance(discriminator, dict) or not isinstance(discriminator.get("propertyName"), str):
+                return None
+            property_name = discriminator["propertyName"]
+            options: list[dict] = self.section["oneOf"]
+            mapping: dict[str, dict] = {}
+            for value, option_reference in (discriminator.get("mapping") or {}).items():
+                option = self._find_option(options, self.compiler.resolve_reference(option_reference))
+                if option is not None:
+                    mapping[value] = option
+            for option in options:
+                discriminator_property = option.get("properties", {}).get(property_name, {})
+                for value in discriminator_property.get("enum") or []:
+                    if isinstance(value, str):
+                        mapping.setdefault(value, option)
+            mapped_options = {id(option) for option in mapping.values()}
+            loader = self.compiler.tester.loader
+            for option in [option for option in options if id(option) not in mapped_options]:
+                component_names = loader.sections.get_component_names(loader.schema or {}, option)
+                mapping.update((name, option) for name in component_names if name not in mapping)
+                if any(mapping[name] is option for name in component_names):
+                    mapped_options.add(id(option))
+            if len(mapped_options) == len(options):
+                self._discriminator = (property_name, mapping)
+        return self._discriminator if self._discriminator[0] else None
+
+    @staticmethod
+    def _find_option(options: list[dict], section: dict | None) -> dict | None:
+        if section is None:
+            return None
+        # de-referenced schemas share the sections references point to, so options are matched by identity
+        for option in options:
+            if option is section:
+                return option
+        return None
+
+    def validate_one_of(self, data: Any, reference: Reference) -> None:
+        option_reference = (reference, ".oneOf")
+        discriminator = self.discriminator
+        if discriminator is not None and isinstance(data, dict):
+            property_name, mapping = discriminator
+            value = data.get(property_name)
+            option = mapping.get(value) if isinstance(value, str) else None
+            if option is not None:
+                # the discriminator picks the one option the data has to match
+                self.sub_plan(option).validate(data, option_reference)
+                return
+        # only the collections of the matching option are counted in the sampling summary
+        sampling_summary = self.compiler.tester.sampling_summary
+        matches = 0
+        passed_schema_section_formats = set()
+        for option in self.section["oneOf"]:
+            checkpoint = sampling_summary.checkpoint()
+            try:
+                self.sub_plan(option).validate(data, option_reference)
+            except DocumentationError:
+                sampling_summary.restore(checkpoint)
+                continue
+            if matches:
+                sampling_summary.restore(checkpoint)
+            matches += 1
+            passed_schema_section_formats.add(option.get("format"))
+        if matches == 2 and passed_schema_section_formats == {"date", "date-time"}:
+            # With Django v4, the datetime validator now parses normal
+            # date formats successfully, so a oneOf: date // datetime section
+            # will succeed twice where it used to succeed once.
+            return
+        if matches != 1:
+            raise DocumentationError(
+                f"{VALIDATE_ONE_OF_ERROR.format(matches=matches)}\n\nReference: {render_reference(option_reference)}"
+            )
+
+    def validate_any_of(self, data: Any, reference: Reference) -> None:
+        """
+        Validates data against an anyOf section.
+
+        Data passes when it matches one of the options, or when it spans several object options. Instead of
+        validating every combination of options, the options the data can be part of - options whose required keys
+        are present, and whose properties accept their values - are merged and validated once, so an anyOf with n
+        options costs at most n + 1 validations.
+        """
+        any_of: list[dict[str, Any]] = self.section.get("anyOf", [])
+        option_reference = (reference, ".anyOf")
+        # only the collections of the accepted option are counted in the sampling summary
+        sampling_summary = self.compiler.tester.sampling_summary
+        checkpoint = sampling_summary.checkpoint()
+        for option in any_of:
+            try:
+                self.sub_plan(option).validate(data, option_reference)
+                return
+            except DocumentationError:
+                sampling_summary.restore(checkpoint)
+                continue
+        if isinstance(data, dict):
+            spanned = tuple(index for index, option in enumerate(any_of) if self.sub_plan(option).accepts_part_of(data))
+            sampling_summary.restore(checkpoint)
+            if len(spanned) > 1:
+                merged_plan = self._merged_plans.get(spanned)
+                if merged_plan is None:
+                    merged_section = merge_objects([any_of[index] for index in spanned])
+                    # merged sections are not part of the schema, so they are not memoized by the compiler
+                    merged_plan = self._merged_plans[spanned] = type(self)(self.compiler, merged_section)
+                try:
+                    merged_plan.validate(data, option_reference)
+                    return
+                except DocumentationError:
+                    pass
+        raise DocumentationError(f"{VALIDATE_ANY_OF_ERROR}\n\nReference: {render_reference(option_reference)}")
+
+    def accepts_part_of(self, data: dict) -> bool:
+        """
+        Returns whether an object section accepts the part of the data it documents: all of its required keys are
+        present, no writeOnly key is, and the values of its properties are valid.
+        """
+        if self.validate_section != self.validate_typed_object:
+            return False
+        properties, required_keys, write_only_properties, _ = self.object_rules
+        if not required_keys.issubset(data.keys()) or not write_only_properties.isdisjoint(data.keys()):
+            return False
+        try:
+            for key, value in data.items():
+                if key in properties:
+                    self.sub_plan(properties[key]).validate(value)
+        except DocumentationError:
+            return False
+        return True
+
+    @property
+    def object_rules(self) -> tuple:
+        """
+        Returns the key rules of an object section: its properties, required keys, writeOnly keys
+        and additionalProperties.
+        """
+        if self._object_rules is None:
+            properties = self.section.get("properties", {})
+            write_only_properties = frozenset(key for key in properties.keys() if properties[key].get("writeOnly"))
+            required_keys = frozenset(
+                key for key in self.section.get("required", []) if key not in write_only_properties
+            )
+            additional_properties: bool | dict | None = self.section.get("additionalProperties")
+            self._object_rules = (properties, required_keys, write_only_properties, additional_properties)
+        return self._object_rules
+
+    def validate_keys(self, data: dict, reference: Reference) -> None:
+        """
+        Validates the keys of an object: the casing of its keys, and that no key is missing, excess or writeOnly.
+        """
+        properties, required_keys, write_only_properties, additional_properties = self.object_rules
+        additional_properties_allowed = additional_properties is not None
+        if additional_properties_allowed and not isinstance(additional_properties, (bool, dict)):
+            raise OpenAPISchemaError("Invalid additionalProperties type")
+        # the outcome of the key checks only depends on the set of keys, which list items tend to share
+        shape = frozenset(data.keys()) if not additional_properties_allowed else None
+        if shape is None or shape not in self._valid_shapes:
+            # the casing of the schema's property names is tested once, when the plan is compiled
+            test_key_casing = self.compiler.test_key_casing
+            for key in properties.keys():
+                if key in required_keys and key not in data:
+                    raise DocumentationError(
+                        f"{VALIDATE_MISSING_RESPONSE_KEY_ERROR.format(missing_key=key)}\n\nReference: "
+                        f"{render_reference(reference)}.object:key:{key}\n\nHint: Remove the key from your"
+                        " OpenAPI docs, or include it in your API response"
+                    )
+            for key in data.keys():
+                test_key_casing(key)
+                if key not in properties and not additional_properties_allowed:
+                    raise DocumentationError(
+                        f"{VALIDATE_EXCESS_RESPONSE_KEY_ERROR.format(excess_key=key)}\n\nReference:"
+                        f" {render_reference(reference)}.object:key:{key}\n\nHint: Remove the key from your API"
+                        " response, or include it in your OpenAPI docs"
+                    )
+                if key in write_only_properties:
+                    raise DocumentationError(
+                        f"{VALIDATE_WRITE_ONLY_RESPONSE_KEY_ERROR.format(write_only_key=key)}\n\nReference:"
+                        f" {render_reference(reference)}.object:key:{key}\n\nHint: Remove the key from your API"
+                        ' response, or remove the "WriteOnly" restriction'
+                    )
+            if shape is not None and len(self._valid_shapes) < MAX_MEMOIZED_SHAPES:
+                self._valid_shapes.add(shape)
+
+    def validate_object(self, data: dict, reference: Reference) -> None:
+        """
+        1. Validate that casing is correct for both response and schema
+        2. Check if any required key is missing from the response
+        3. Check if any response key is not in the schema
+        4. Validate sub-schema/nested data
+        """
+        self.validate_keys(data, reference)
+        for plan, value, value_reference in self.object_children(data, reference):
+            plan.validate(value, value_reference)
+
+    def object_children(self, data: dict, reference: Reference) -> Iterator[tuple[ValidationPlan, Any, Reference]]:
+        """
+        Yields the values of an object to validate, in order, with their plans and references.
+        """
+        properties, _, _, additional_properties = self.object_rules
+        sampled_keys: set[str] | None = None
+        if isinstance(additional_properties, dict):
+            sampling = self.compiler.sampling
+            if sampling.validates_all:
+                additional_count = len(data) - len(properties.keys() & data.keys())
+                self.compiler.tester.sampling_summary.record(additional_count, additional_count)
+            else:
+                additional_keys = [key for key in data.keys() if key not in properties]
+                sampled_keys = {additional_keys[index] for index in sampling.select(len(additional_keys))}
+                self.compiler.tester.sampling_summary.record(len(additional_keys), len(sampled_keys))
+        for key, value in data.items():
+            if key in properties:
+                yield self.sub_plan(properties[key]), value, (reference, ".object:key:", key)
+            elif isinstance(additional_properties, dict) and (sampled_keys is None or key in sampled_keys):
+                yield self.sub_plan(additional_properties), value, (reference, ".object:key:", key)
+
+    def validate_array(self, data: list, reference: Reference) -> None:
+        for plan, datum, item_reference in self.array_children(data, reference):
+            plan.validate(datum, item_reference)
+
+    def array_children(self, data: list, reference: Reference) -> Iterator[tuple[ValidationPlan, Any, Reference]]:
+        """
+        Yields the items of an array to validate, in order, with their plans and references.
+        """
+        if not data:
+            return
+        # the items keyword is required in arrays
+        items_plan = self.sub_plan(self.section["items"])
+        # all items share the same reference
+        item_reference = (reference, ".array.item")
+        sampling = self.compiler.sampling
+        if sampling.validates_all:
+            self.compiler.tester.sampling_summary.record(len(data), len(data))
+            for datum in data:
+                yield items_plan, datum, item_reference
+            return
+        indices = sampling.select(len(data))
+        self.compiler.tester.sampling_summary.record(len(data), len(indices))
+        for index in indices:
+            yield items_plan, data[index], item_reference
+
+
+class IterativeValidationPlan(ValidationPlan):
+    """
+    A validation plan of the iterative engine, which walks objects and arrays with an explicit stack.
+    """
+
+    def validate(self, data: Any, reference: Reference = "init") -> None:
+        """
+        Validates data against the plan, like ``ValidationPlan.validate``, walking objects and arrays with an explicit
+        stack.
+
+        Values are validated in the same order as by the recursive engine, so the same error is raised, but nesting
+        depth is not limited by the interpreter's recursion limit. Options of oneOf and anyOf sections are validated in
+        separate walks.
+        """
+        # a stack of iterators over the children of the objects and arrays being walked
+        stack: list[Iterator[tuple[ValidationPlan, Any, Reference]]] = [iter(((self, data, reference),))]
+        while stack:
+            for plan, value, value_reference in stack[-1]:
+                if value is None:
+                    if plan.nullable:
+                        continue
+                    raise plan.none_error(value_reference)
+                if plan.is_object:
+                    plan.validate_checks(value, value_reference)
+                    plan.validate_keys(value, value_reference)
+                    stack.append(plan.object_children(value, value_reference))
+                    break
+                if plan.is_array:
+                    plan.validate_checks(value, value_reference)
+                    stack.append(plan.array_children(value, value_reference))
+                    break
+                plan.validate_section(value, value_reference)
+            else:
+                stack.pop()
+
+
+# Validation plan classes, by validation engine
+PLAN_CLASSES: dict[str, type[ValidationPlan]] = {
+    RECURSIVE_ENGINE: ValidationPlan,
+    ITERATIVE_ENGINE: IterativeValidationPlan,
+}
@@ -9,10 +9,14 @@ OPENAPI_PYTHON_MAPPING = {
     "number": f"{int.__name__} or {float.__name__}",
 }
 
+JSON_MEDIA_TYPE_PATTERN = r"^application\/.*json$"
+
 # Validation errors
 VALIDATE_FORMAT_ERROR = 'Expected: {article} "{format}" formatted value\n\nReceived: {received}'
 VALIDATE_PATTERN_ERROR = 'The string "{data}" does not match the specified pattern: {pattern}'
 INVALID_PATTERN_ERROR = "String pattern is not valid regex: {pattern}"
+UNSAFE_PATTERN_WARNING = "String pattern is prone to catastrophic backtracking and will not be validated: {pattern}"
+CACHED_SCHEMA_WARNING = "Could not download the schema from {url}, using the cached copy instead: {error}"
 VALIDATE_ENUM_ERROR = "Expected: a member of the enum {enum}\n\nReceived: {received}"
 VALIDATE_TYPE_ERROR = 'Expected: {article} "{type}" type value\n\nReceived: {received}'
 VALIDATE_MULTIPLE_OF_ERROR = "The response value {data} should be a multiple of {multiple}"
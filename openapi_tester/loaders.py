@@ -2,48 +2,274 @@
 from __future__ import annotations
 
 import difflib
-import json
 import pathlib
 import re
-from json import dumps, loads
+import warnings
+from functools import lru_cache, partial
+from json import dumps
 from typing import TYPE_CHECKING, cast
 from urllib.parse import urlparse
+from urllib.request import url2pathname
 
 import requests
-import yaml
-from django.urls import Resolver404, resolve
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.urls import Resolver404, get_urlconf, resolve
 from django.utils.functional import cached_property
 from openapi_spec_validator import openapi_v2_spec_validator, openapi_v30_spec_validator, openapi_v31_spec_validator
-from prance.util.resolver import RefResolver
 from rest_framework.schemas.generators import BaseSchemaGenerator, EndpointEnumerator
 from rest_framework.settings import api_settings
 
-from openapi_tester.constants import UNDOCUMENTED_SCHEMA_SECTION_ERROR
+from openapi_tester.cache import (
+    SchemaCache,
+    get_cache_dir,
+    get_code_fingerprint,
+    get_distribution_version,
+    hash_content,
+)
+from openapi_tester.constants import (
+    CACHED_SCHEMA_WARNING,
+    JSON_MEDIA_TYPE_PATTERN,
+    UNDOCUMENTED_SCHEMA_SECTION_ERROR,
+)
 from openapi_tester.exceptions import UndocumentedSchemaSectionError
+from openapi_tester.parsers import parse_schema
+from openapi_tester.references import ReferenceResolver
+from openapi_tester.utils import LRUCache, normalize_schema_section, to_plain_data
+from openapi_tester.validators import compile_pattern
 
 if TYPE_CHECKING:
     from typing import Any, Callable
-    from urllib.parse import ParseResult
 
     from django.urls import ResolverMatch
     from rest_framework.views import APIView
 
 
-def handle_recursion_limit(schema: dict) -> Callable:
+# Settings that change the outcome of schema loading; changing any of them clears the schema registry
+SCHEMA_SETTINGS = frozenset(
+    {
+        "INSTALLED_APPS",
+        "OPENAPI_TESTER_LAZY_REFERENCES",
+        "REST_FRAMEWORK",
+        "ROOT_URLCONF",
+        "SPECTACULAR_SETTINGS",
+        "SWAGGER_SETTINGS",
+    }
+)
+
+
+def lazy_references_enabled() -> bool:
+    """
+    Returns whether schemas are de-referenced lazily, one response schema at a time, through the
+    ``OPENAPI_TESTER_LAZY_REFERENCES`` setting.
+    """
+    return bool(getattr(settings, "OPENAPI_TESTER_LAZY_REFERENCES", False))
+
+
+class SchemaRegistry:
+    """
+    Process-wide registry of loaded schemas.
+
+    Loading a schema means generating or reading it, then de-referencing and validating it, so the result is shared
+    between all loaders with the same class, source and field_key_map. Registered schemas are shared between
+    ``SchemaTester`` and ``OpenAPIClient`` instances, and must be treated as read-only. The response schema index of
+    each registered schema is kept alongside it.
+    """
+
+    def __init__(self) -> None:
+        self._schemas: dict[tuple, dict] = {}
+        self._response_schema_indexes: dict[tuple, tuple[dict, dict[tuple[str, str, str], dict]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._schemas)
+
+    def get(self, key: tuple) -> dict | None:
+        return self._schemas.get(key)
+
+    def register(self, key: tuple, schema: dict) -> None:
+        self._schemas[key] = schema
+
+    def get_response_schema_index(self, key: tuple, schema: dict) -> dict[tuple[str, str, str], dict] | None:
+        """
+        Returns the response schema index registered for a key, if it was built from the given schema object.
+        """
+        registered = self._response_schema_indexes.get(key)
+        if registered is None or registered[0] is not schema:
+            return None
+        return registered[1]
+
+    def register_response_schema_index(self, key: tuple, schema: dict, index: dict[tuple[str, str, str], dict]) -> None:
+        self._response_schema_indexes[key] = (schema, index)
+
+    def clear(self) -> None:
+        self._schemas.clear()
+        self._response_schema_indexes.clear()
+
+
+schema_registry = SchemaRegistry()
+
+# Resolved, parameterized paths, per loader registry key
+RESOLVED_PATH_CACHE_SIZE = 1024
+resolved_path_caches: dict[tuple, LRUCache] = {}
+
+
+class ResolvedSectionCache:
+    """
+    The de-referenced and normalized sections of a lazily processed schema, by the id of the original section.
+    """
+
+    def __init__(self, schema: dict, resolver: ReferenceResolver) -> None:
+        self.schema = schema
+        self.resolver = resolver
+        self._sections: dict[int, tuple[dict, dict]] = {}
+        self._normalized_sections: dict[int, tuple[dict, dict]] = {}
+        self._pattern_compiled_sections: set[int] = set()
+
+    def get(self, section: dict) -> dict:
+        """
+        Returns a section with its references resolved and normalized, and its patterns compiled.
+        """
+        cached = self._sections.get(id(section))
+        if cached is None:
+            resolved = normalize_schema_section(self.resolver.resolve(section), self._normalized_sections)
+            BaseSchemaLoader.compile_patterns(resolved, self._pattern_compiled_sections)
+            cached = self._sections[id(section)] = (section, resolved)
+        return cached[1]
+
+    def follow(self, section: Any) -> Any:
+        """
+        Follows the references of a section to the section they point to. Sections of other documents are resolved
+        right away, as their references are relative to the document they are in.
+        """
+        followed, url = self.resolver.follow(section)
+        if url != self.resolver.url:
+            return self.resolver.resolve(followed, url)
+        return followed
+
+
+# Resolved sections of lazily processed schemas, per loader registry key
+resolved_section_caches: dict[tuple, ResolvedSectionCache] = {}
+
+
+class SchemaSections:
     """
-    We are using a currying pattern to pass schema into the scope of the handler.
+    Looks up the sections of a loader's schema: response schemas through an index, and, for lazily processed schemas,
+    sections resolved on first use. The index and resolved sections are shared by loaders with the same registry key.
     """
 
-    # noinspection PyUnusedLocal
-    def handler(iteration: int, parse_result: ParseResult, recursions: tuple):  # pylint: disable=unused-argument
-        fragment = parse_result.fragment
-        keys = [key for key in fragment.split("/") if key]
-        definition = schema
-        for key in keys:
-            definition = definition[key]
-        return definition
+    def __init__(self, loader: BaseSchemaLoader) -> None:
+        self.loader = loader
+        self._component_names: tuple[dict, dict[int, tuple[dict, list[str]]]] | None = None
+
+    def get_response_schema_index(self, schema: dict) -> dict[tuple[str, str, str], dict]:
+        """
+        Returns an index of the response schema sections of a schema, by parameterized path, method and status code.
+
+        Status codes are indexed as strings, and for OpenAPI 3 schemas the json media type is picked ahead of time.
+        Responses without a documented schema are left out of the index. The index is built once per schema object,
+        and kept in the schema registry, so it is shared by loaders with the same registry key.
+
+        For lazily processed schemas, only the references leading up to response schemas are followed, and the indexed
+        response schemas are left as they are in the schema; see ``resolve``.
+        """
+        registry_key = self.loader.get_registry_key()
+        registered_index = schema_registry.get_response_schema_index(registry_key, schema)
+        if registered_index is not None:
+            return registered_index
+        follow: Callable[[Any], Any] = (
+            self.get_resolved_section_cache(schema).follow if lazy_references_enabled() else lambda section: section
+        )
+        index: dict[tuple[str, str, str], dict] = {}
+        json_media_type_pattern = re.compile(JSON_MEDIA_TYPE_PATTERN)
+        is_openapi_3 = "openapi" in schema
+        for path, route_object in schema.get("paths", {}).items():
+            route_object = follow(route_object)
+            if not isinstance(route_object, dict):
+                continue
+            for method, method_object in route_object.items():
+                method_object = follow(method_object)
+                if not isinstance(method_object, dict):
+                    continue
+                responses_object = follow(method_object.get("responses"))
+                if not isinstance(responses_object, dict):
+                    continue
+                responses_by_status_code: dict[str, Any] = {}
+                for status_code, status_code_object in responses_object.items():
+                    # string status codes take precedence over integer ones
+                    if isinstance(status_code, str) or str(status_code) not in responses_by_status_code:
+                        responses_by_status_code[str(status_code)] = status_code_object
+                for status_code, status_code_object in responses_by_status_code.items():
+                    status_code_object = follow(status_code_object)
+                    if not isinstance(status_code_object, dict):
+                        continue
+                    if not is_openapi_3:
+                        response_schema = status_code_object.get("schema")
+                    else:
+                        content_object = follow(status_code_object.get("content")) or {}
+                        json_object = follow(
+                            next(
+                                (
+                                    value
+                                    for media_type, value in content_object.items()
+                                    if json_media_type_pattern.match(media_type)
+                                ),
+                                {},
+                            )
+                        )
+                        response_schema = json_object.get("schema")
+                    if response_schema is not None:
+                        index[(path, method, status_code)] = response_schema
+        schema_registry.register_response_schema_index(registry_key, schema, index)
+        return index
+
+    def get_resolved_section_cache(self, schema: dict) -> ResolvedSectionCache:
+        """
+        Returns the resolved sections of a lazily processed schema, shared by loaders with the same registry key.
+        """
+        registry_key = self.loader.get_registry_key()
+        resolved_section_cache = resolved_section_caches.get(registry_key)
+        if resolved_section_cache is None or resolved_section_cache.schema is not schema:
+            resolved_section_cache = resolved_section_caches[registry_key] = ResolvedSectionCache(
+                schema, self.loader.get_reference_resolver(schema)
+            )
+        return resolved_section_cache
 
-    return handler
+    def resolve(self, section: dict) -> dict:
+        """
+        Returns a section of the schema, ready for validation.
+
+        Sections of processed schemas are returned as-is. Sections of lazily processed schemas are de-referenced and
+        normalized, and their patterns compiled, the first time they are requested.
+        """
+        if not lazy_references_enabled():
+            return section
+        return self.get_resolved_section_cache(self.loader.get_schema()).get(section)
+
+    def get_component_names(self, schema: dict, section: dict) -> list[str]:
+        """
+        Returns the names of the component schemas a resolved section is. Sections are matched by identity, since
+        resolved sections share the component sections they reference. The index of component names is built once per
+        schema object.
+        """
+        if self._component_names is None or self._component_names[0] is not schema:
+            component_names: dict[int, tuple[dict, list[str]]] = {}
+            for name, component in schema.get("components", {}).get("schemas", {}).items():
+                if isinstance(component, dict):
+                    resolved = self.resolve(component)
+                    # the resolved section is kept, so its id cannot be reused while it's indexed
+                    component_names.setdefault(id(resolved), (resolved, []))[1].append(name)
+            self._component_names = (schema, component_names)
+        indexed = self._component_names[1].get(id(section))
+        return indexed[1] if indexed is not None else []
+
+
+@receiver(setting_changed)
+def clear_schema_registry(setting: str, **kwargs: Any) -> None:  # pylint: disable=unused-argument
+    if setting in SCHEMA_SETTINGS:
+        schema_registry.clear()
+        resolved_path_caches.clear()
+        resolved_section_caches.clear()
 
 
 class BaseSchemaLoader:
@@ -54,7 +280,6 @@ class BaseSchemaLoader:
     with an OpenAPI schema.
     """
 
-    base_path = "/"
     field_key_map: dict[str, str]
     schema: dict | None = None
 
@@ -62,6 +287,8 @@ class BaseSchemaLoader:
         super().__init__()
         self.schema: dict | None = None
         self.field_key_map = field_key_map or {}
+        self.sections = SchemaSections(self)
+        self._reference_digests: dict[str, str] = {}
 
     def load_schema(self) -> dict:
         """
@@ -69,26 +296,122 @@ class BaseSchemaLoader:
         """
         raise NotImplementedError("The `load_schema` method has to be overwritten.")
 
+    def get_schema_source(self) -> str | None:
+        """
+        Returns the path or url the schema is loaded from, if any.
+        """
+        return None
+
+    def get_registry_key(self) -> tuple:
+        """
+        Returns the key of this loader's schema in the schema registry.
+        """
+        return type(self), self.get_schema_source(), tuple(sorted(self.field_key_map.items()))
+
     def get_schema(self) -> dict:
         """
         Returns OpenAPI schema.
         """
         if self.schema:
             return self.schema
-        self.set_schema(self.load_schema())
-        return self.get_schema()
+        registry_key = self.get_registry_key()
+        schema = schema_registry.get(registry_key)
+        if schema is None:
+            schema = self.normalize_schema_paths(self.get_processed_schema())
+            if not lazy_references_enabled():
+                self.compile_patterns(schema)
+            schema_registry.register(registry_key, schema)
+        self.schema = schema
+        return schema
 
-    def de_reference_schema(self, schema: dict) -> dict:
-        url = schema.get("basePath", self.base_path)
-        recursion_handler = handle_recursion_limit(schema)
-        resolver = RefResolver(
+    @staticmethod
+    def compile_patterns(schema: dict, visited: set[int] | None = None) -> None:
+        """
+        Compiles every string pattern in a schema, so invalid patterns are reported when the schema is loaded and
+        validation only has to look compiled patterns up. Sections with ids in ``visited`` are skipped, and the ids of
+        visited sections are added to it.
+
+        :raises: openapi_tester.exceptions.OpenAPISchemaError for invalid patterns
+        """
+        if visited is None:
+            visited = set()
+        stack: list[Any] = [schema]
+        while stack:
+            node = stack.pop()
+            if id(node) in visited:
+                continue
+            visited.add(id(node))
+            if isinstance(node, dict):
+                if isinstance(node.get("pattern"), str):
+                    compile_pattern(node["pattern"])
+                stack.extend(value for value in node.values() if isinstance(value, (dict, list)))
+            else:
+                stack.extend(value for value in node if isinstance(value, (dict, list)))
+
+    def get_content_digest(self) -> str:
+        """
+        Returns a digest of the schema source, computed without loading the schema.
+
+        :raises: NotImplementedError for loaders that can only digest the loaded schema
+        """
+        raise NotImplementedError("The `get_content_digest` method is not implemented for this loader.")
+
+    def get_processed_schema(self) -> dict:
+        """
+        Returns the loaded and processed schema, from the schema cache when a cache directory is configured.
+        """
+        cache_dir = get_cache_dir()
+        if not cache_dir:
+            return self.process_schema(self.load_schema())
+        schema_cache = SchemaCache(cache_dir)
+        schema: dict | None = None
+        try:
+            content_digest = self.get_content_digest()
+        except NotImplementedError:
+            schema = self.load_schema()
+            content_digest = hash_content(dumps(schema, sort_keys=True))
+        cache_key = self.get_cache_key(content_digest)
+        processed_schema = get_cached_schema(schema_cache, cache_key)
+        if processed_schema is None:
+            self._reference_digests.clear()
+            processed_schema = self.process_schema(schema if schema is not None else self.load_schema())
+            # the digests of the documents the schema references are stored with it, so changes to them are detected
+            schema_cache.set(cache_key, (processed_schema, dict(self._reference_digests)))
+        return processed_schema
+
+    @staticmethod
+    def get_cache_key(content_digest: str) -> str:
+        """
+        Returns the schema cache key of a schema with a content digest. Lazily processed schemas are not de-referenced,
+        so they are cached apart from processed ones.
+        """
+        return f"lazy:{content_digest}" if lazy_references_enabled() else content_digest
+
+    def get_reference_base_url(self) -> str | None:
+        """
+        Returns the url references to other documents are resolved relative to: the url of the schema file, if any.
+        """
+        return None
+
+    def get_reference_resolver(self, schema: dict) -> ReferenceResolver:
+        """
+        Returns a resolver for the references of a schema.
+        """
+        return ReferenceResolver(
             schema,
-            recursion_limit_handler=recursion_handler,
-            recursion_limit=10,
-            url=url,
+            url=self.get_reference_base_url(),
+            fetch_document=partial(fetch_reference_document, reference_digests=self._reference_digests),
         )
-        resolver.resolve_references()
-        return resolver.specs
+
+    def de_reference_schema(self, schema: dict) -> dict:
+        """
+        Returns a copy of a schema with all of its references resolved.
+
+        Every referenced section is resolved once, and shared by all the sections that reference it, so a component
+        is kept in memory, and compiled for validation, once however many operations use it. Circular references are
+        resolved to circular structures.
+        """
+        return cast("dict", self.get_reference_resolver(schema).resolve(schema))
 
     def normalize_schema_paths(self, schema: dict) -> dict[str, dict]:
         normalized_paths: dict[str, dict] = {}
@@ -101,7 +424,11 @@ class BaseSchemaLoader:
         return {**schema, "paths": normalized_paths}
 
     @staticmethod
-    def validate_schema(schema: dict):
+    def validate_schema(schema: dict, base_uri: str = ""):
+        """
+        Validates a schema against the OpenAPI specification. References to other documents are resolved relative to
+        ``base_uri``.
+        """
         if "openapi" in schema:
             openapi_version_pattern = re.compile(r"^(\d)\.(\d+)")
             result = openapi_version_pattern.findall(schema["openapi"])
@@ -121,15 +448,29 @@ class BaseSchemaLoader:
                 raise UndocumentedSchemaSectionError(UNDOCUMENTED_SCHEMA_SECTION_ERROR.format(key=schema["openapi"]))
         else:
             validator = openapi_v2_spec_validator
-        validator.validate(schema)
+        validator.validate(schema, base_uri=base_uri)
+
+    def process_schema(self, schema: dict) -> dict:
+        """
+        Validates, de-references and normalizes a schema.
+
+        The result only depends on the schema content, which makes it cacheable. Normalizing the whole schema here,
+        once, means schema sections can be used as-is during validation.
+
+        With the ``OPENAPI_TESTER_LAZY_REFERENCES`` setting enabled, schemas are used as they are, and sections are
+        processed when they are first requested instead; see ``SchemaSections.resolve``.
+        """
+        if lazy_references_enabled():
+            return schema
+        # the schema is validated before it's de-referenced, so shared and circular sections are validated once
+        self.validate_schema(schema, base_uri=self.get_reference_base_url() or "")
+        return normalize_schema_section(self.de_reference_schema(schema))
 
     def set_schema(self, schema: dict) -> None:
         """
         Sets self.schema and self.original_schema.
         """
-        de_referenced_schema = self.de_reference_schema(schema)
-        self.validate_schema(de_referenced_schema)
-        self.schema = self.normalize_schema_paths(de_referenced_schema)
+        self.schema = self.normalize_schema_paths(self.process_schema(schema))
 
     @cached_property
     def endpoints(self) -> list[str]:
@@ -169,6 +510,32 @@ class BaseSchemaLoader:
             message += "\n\nDid you mean one of these?\n\n- " + "\n- ".join(close_matches)
         raise ValueError(message)
 
+    @property
+    def resolved_path_cache(self) -> LRUCache:
+        """
+        Returns the cache of resolved paths shared by loaders with the same registry key, which includes the loader
+        class, schema source and field_key_map.
+        """
+        registry_key = self.get_registry_key()
+        resolved_path_cache = resolved_path_caches.get(registry_key)
+        if resolved_path_cache is None:
+            resolved_path_cache = resolved_path_caches[registry_key] = LRUCache(maxsize=RESOLVED_PATH_CACHE_SIZE)
+        return resolved_path_cache
+
+    def resolve_parameterized_path(self, endpoint_path: str, method: str) -> str:
+        """
+        Returns the parameterized path of a Django path, as resolved by resolve_path.
+
+        Results are cached per path, method and URLconf, in a size-bounded cache.
+        """
+        resolved_path_cache = self.resolved_path_cache
+        cache_key = (endpoint_path, method, get_urlconf() or settings.ROOT_URLCONF)
+        parameterized_path = resolved_path_cache.get(cache_key)
+        if parameterized_path is None:
+            parameterized_path, _ = self.resolve_path(endpoint_path, method=method)
+            resolved_path_cache.set(cache_key, parameterized_path)
+        return parameterized_path
+
     @staticmethod
     def handle_pk_parameter(resolved_route: ResolverMatch, path: str, method: str) -> tuple[str, ResolverMatch]:
         """
@@ -197,12 +564,24 @@ class DrfYasgSchemaLoader(BaseSchemaLoader):
 
         self.schema_generator = OpenAPISchemaGenerator(info=Info(title="", default_version=""))
 
+    def get_content_digest(self) -> str:
+        """
+        Returns a fingerprint of the code and settings the schema is generated from, so a cached schema can be used
+        without generating it.
+        """
+        return get_code_fingerprint(
+            SCHEMA_SETTINGS,
+            type(self).__name__,
+            get_distribution_version("drf-yasg"),
+            get_distribution_version("djangorestframework"),
+            get_distribution_version("django"),
+        )
+
     def load_schema(self) -> dict:
         """
         Loads generated schema from drf-yasg and returns it as a dict.
         """
-        odict_schema = self.schema_generator.get_schema(None, True)
-        return cast("dict", loads(dumps(odict_schema.as_odict())))
+        return cast("dict", to_plain_data(self.schema_generator.get_schema(None, True)))
 
     def resolve_path(self, endpoint_path: str, method: str) -> tuple[str, ResolverMatch]:
         de_parameterized_path, resolved_path = super().resolve_path(endpoint_path=endpoint_path, method=method)
@@ -222,11 +601,24 @@ class DrfSpectacularSchemaLoader(BaseSchemaLoader):
 
         self.schema_generator = SchemaGenerator()
 
+    def get_content_digest(self) -> str:
+        """
+        Returns a fingerprint of the code and settings the schema is generated from, so a cached schema can be used
+        without generating it.
+        """
+        return get_code_fingerprint(
+            SCHEMA_SETTINGS,
+            type(self).__name__,
+            get_distribution_version("drf-spectacular"),
+            get_distribution_version("djangorestframework"),
+            get_distribution_version("django"),
+        )
+
     def load_schema(self) -> dict:
         """
         Loads generated schema from drf_spectacular and returns it as a dict.
         """
-        return cast("dict", loads(dumps(self.schema_generator.get_schema(public=True))))
+        return cast("dict", to_plain_data(self.schema_generator.get_schema(public=True)))
 
     def resolve_path(self, endpoint_path: str, method: str) -> tuple[str, ResolverMatch]:
         from drf_spectacular.settings import spectacular_settings
@@ -247,18 +639,121 @@ class StaticSchemaLoader(BaseSchemaLoader):
         super().__init__(field_key_map=field_key_map)
         self.path = path if not isinstance(path, pathlib.PosixPath) else str(path)
 
+    def get_schema_source(self) -> str:
+        return self.path
+
+    def get_reference_base_url(self) -> str:
+        return pathlib.Path(self.path).resolve().as_uri()
+
+    def get_content_digest(self) -> str:
+        with open(self.path, "rb") as file:
+            return hash_content(file.read())
+
     def load_schema(self) -> dict[str, Any]:
         """
-        Loads a static OpenAPI schema from file, and parses it to a python dict.
+        Loads a static OpenAPI schema from file, and parses it to a python dict. The format, JSON or YAML, is
+        detected from the file's content.
 
         :return: Schema contents as a dict
         :raises: ImproperlyConfigured
         """
-        with open(self.path, encoding="utf-8") as file:
-            content = file.read()
-            return cast(
-                "dict", json.loads(content) if ".json" in self.path else yaml.load(content, Loader=yaml.FullLoader)
-            )
+        with open(self.path, "rb") as file:
+            return cast("dict", parse_schema(file.read()))
+
+
+@lru_cache(maxsize=None)
+def get_session() -> requests.Session:
+    """
+    Returns the session schemas are downloaded with, so connections are pooled between downloads.
+    """
+    return requests.Session()
+
+
+def download_schema(url: str) -> bytes:
+    """
+    Downloads a schema document.
+
+    When a cache directory is configured, documents are stored there together with their ``ETag`` and
+    ``Last-Modified`` headers, and later downloads are conditional requests, so unchanged documents are not
+    transferred again. When the host cannot be reached, the cached copy is used with a warning. With the
+    ``OPENAPI_TESTER_OFFLINE`` setting enabled, cached copies are used without making any request.
+
+    :raises: requests.RequestException when the document cannot be downloaded, and no copy is cached
+    """
+    cache_dir = get_cache_dir()
+    schema_cache = SchemaCache(cache_dir) if cache_dir else None
+    cache_key = f"url:{url}"
+    cached = schema_cache.get(cache_key) if schema_cache else None
+    if not isinstance(cached, dict):
+        cached = None
+    if cached and getattr(settings, "OPENAPI_TESTER_OFFLINE", False):
+        return cast("bytes", cached["content"])
+    headers = {}
+    if cached and cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    if cached and cached.get("last_modified"):
+        headers["If-Modified-Since"] = cached["last_modified"]
+    try:
+        response = get_session().get(url, headers=headers, timeout=20)
+    except (requests.ConnectionError, requests.Timeout) as e:
+        if not cached:
+            raise
+        warnings.warn(CACHED_SCHEMA_WARNING.format(url=url, error=e), stacklevel=2)
+        return cast("bytes", cached["content"])
+    if cached and response.status_code == 304:
+        return cast("bytes", cached["content"])
+    response.raise_for_status()
+    if schema_cache:
+        schema_cache.set(
+            cache_key,
+            {
+                "content": response.content,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            },
+        )
+    return response.content
+
+
+def get_reference_content(url: str) -> bytes:
+    """
+    Returns the content of a document referenced from a schema, read from a file for ``file:`` urls, and downloaded
+    through ``download_schema`` otherwise.
+    """
+    parsed_url = urlparse(url)
+    if parsed_url.scheme == "file":
+        with open(url2pathname(parsed_url.path), "rb") as file:
+            return file.read()
+    return download_schema(url)
+
+
+def fetch_reference_document(url: str, reference_digests: dict[str, str] | None = None) -> Any:
+    """
+    Loads a document referenced from a schema. The digest of the document's content is recorded in
+    ``reference_digests``, when given.
+    """
+    content = get_reference_content(url)
+    if reference_digests is not None:
+        reference_digests[url] = hash_content(content)
+    return parse_schema(content)
+
+
+def get_cached_schema(schema_cache: SchemaCache, cache_key: str) -> dict | None:
+    """
+    Returns a processed schema from the schema cache, unless one of the documents it references has changed, or can no
+    longer be read, since it was cached.
+    """
+    entry = schema_cache.get(cache_key)
+    if not isinstance(entry, tuple) or len(entry) != 2 or not isinstance(entry[0], dict):
+        return None
+    processed_schema, reference_digests = entry
+    for url, digest in reference_digests.items():
+        try:
+            if hash_content(get_reference_content(url)) != digest:
+                return None
+        except (OSError, requests.RequestException):
+            return None
+    return processed_schema
 
 
 class UrlStaticSchemaLoader(BaseSchemaLoader):
@@ -269,20 +764,31 @@ class UrlStaticSchemaLoader(BaseSchemaLoader):
     def __init__(self, url: str, field_key_map: dict[str, str] | None = None):
         super().__init__(field_key_map=field_key_map)
         self.url = url
+        self._content: bytes | None = None
+
+    def get_schema_source(self) -> str:
+        return self.url
+
+    def get_reference_base_url(self) -> str:
+        return self.url
+
+    def get_content(self) -> bytes:
+        """
+        Returns the schema document, downloaded once per loader.
+        """
+        if self._content is None:
+            self._content = download_schema(self.url)
+        return self._content
+
+    def get_content_digest(self) -> str:
+        return hash_content(self.get_content())
 
     def load_schema(self) -> dict[str, Any]:
         """
-        Loads a static OpenAPI schema from url, and parses it to a python dict.
+        Loads a static OpenAPI schema from url, and parses it to a python dict. The format, JSON or YAML, is
+        detected from the response's content.
 
         :return: Schema contents as a dict
         :raises: ImproperlyConfigured
         """
-        response = requests.get(self.url, timeout=20)
-        return cast(
-            "dict",
-            (
-                json.loads(response.content)
-                if ".json" in self.url
-                else yaml.load(response.content, Loader=yaml.FullLoader)
-            ),
-        )
+        return cast("dict", parse_schema(self.get_content()))
@@ -0,0 +1,47 @@
+""" Management command that prebuilds the schema cache """
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from django.core.management.base import BaseCommand, CommandError
+
+from openapi_tester.cache import SchemaCache, get_cache_dir
+from openapi_tester.loaders import get_cached_schema
+from openapi_tester.schema_tester import SchemaTester
+
+if TYPE_CHECKING:
+    from typing import Any
+
+    from django.core.management.base import CommandParser
+
+
+class Command(BaseCommand):
+    """
+    Loads and processes the schema once, and stores the result in the schema cache, unless it is up to date.
+    """
+
+    help = (
+        "Loads the OpenAPI schema, generating it with drf-spectacular or drf-yasg unless a schema file is passed, and "
+        "stores the processed schema in OPENAPI_TESTER_CACHE_DIR, so test runs can load it from there."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--schema-file-path", help="The path or url of a schema file, instead of a generated schema"
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        cache_dir = get_cache_dir()
+        if not cache_dir:
+            raise CommandError("The OPENAPI_TESTER_CACHE_DIR setting is not set.")
+        loader = SchemaTester(schema_file_path=options.get("schema_file_path")).loader
+        try:
+            cache_key: str | None = loader.get_cache_key(loader.get_content_digest())
+        except NotImplementedError:
+            # the schema has to be loaded to tell whether its cache entry is up to date
+            cache_key = None
+        if cache_key is not None and get_cached_schema(SchemaCache(cache_dir), cache_key) is not None:
+            self.stdout.write(f"The schema cache in {cache_dir} is up to date.")
+            return
+        loader.get_processed_schema()
+        self.stdout.write(f"Cached the schema in {cache_dir}.")
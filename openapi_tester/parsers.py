@@ -0,0 +1,86 @@
+""" Parsers module - parses JSON and YAML schema documents """
+from __future__ import annotations
+
+import importlib
+import json
+import re
+from typing import TYPE_CHECKING, cast
+
+import yaml
+
+if TYPE_CHECKING:
+    from typing import Any, Callable
+
+JSON_FORMAT = "json"
+YAML_FORMAT = "yaml"
+
+# The libyaml based loader is several times faster than the pure python one, when PyYAML is built with it.
+# Aliases are constructed as the same object as their anchors, so shared sections are not copied.
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def _get_json_decoder() -> Callable[[bytes | str], Any] | None:
+    """
+    Returns the fastest installed third-party JSON decoder, if any.
+    """
+    for module_name in ("orjson", "ujson"):
+        try:
+            return cast("Callable[[bytes | str], Any]", importlib.import_module(module_name).loads)
+        except ImportError:
+            continue
+    return None
+
+
+JSON_DECODER = _get_json_decoder()
+
+_JSON_START = re.compile(r"\ufeff?[ \t\r\n]*[{\[]")
+_JSON_START_BYTES = re.compile(rb"(?:\xef\xbb\xbf)?[ \t\r\n]*[{\[]")
+
+
+def sniff_format(content: bytes | str) -> str:
+    """
+    Returns the format of a document: JSON when its first character, after any byte order mark and whitespace, opens
+    an object or array, and YAML otherwise.
+    """
+    if isinstance(content, bytes):
+        is_json = _JSON_START_BYTES.match(content) is not None
+    else:
+        is_json = _JSON_START.match(content) is not None
+    return JSON_FORMAT if is_json else YAML_FORMAT
+
+
+def parse_json(content: bytes | str) -> Any:
+    """
+    Parses a JSON document with the fastest installed decoder. Documents that a third-party decoder rejects, like
+    ones with integers beyond 64 bits or NaN values, are parsed again with the json module.
+
+    :raises: ValueError for invalid documents
+    """
+    if JSON_DECODER is not None:
+        try:
+            return JSON_DECODER(content)
+        except ValueError:
+            pass
+    return json.loads(content)
+
+
+def parse_yaml(content: bytes | str) -> Any:
+    """
+    Parses a YAML document.
+
+    :raises: yaml.YAMLError for invalid documents
+    """
+    return yaml.load(content, Loader=YamlLoader)  # nosec - the loader is a safe loader
+
+
+def parse_schema(content: bytes | str) -> Any:
+    """
+    Parses a schema document, sniffing whether it's JSON or YAML. YAML is a superset of JSON, so documents that look
+    like JSON but are not valid JSON are parsed as YAML.
+    """
+    if sniff_format(content) == JSON_FORMAT:
+        try:
+            return parse_json(content)
+        except ValueError:
+            pass
+    return parse_yaml(content)
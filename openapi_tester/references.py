@@ -0,0 +1,122 @@
+""" References module - resolves $ref references in schema documents """
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+from urllib.parse import unquote, urljoin
+
+from openapi_tester.exceptions import OpenAPISchemaError
+from openapi_tester.utils import resolve_fragment
+
+if TYPE_CHECKING:
+    from typing import Any, Callable
+
+
+class ReferenceResolver:
+    """
+    Resolves the ``$ref`` references of a schema document, one section at a time.
+
+    A resolved section is a copy of the section in which every reference is replaced by the resolved section it points
+    to. Resolved sections are memoized, so each section is resolved at most once, and a section referenced from several
+    places is shared between them. Circular references are resolved to circular structures.
+
+    References to other documents are resolved relative to the url of the document they are in, and the documents are
+    loaded with ``fetch_document``.
+    """
+
+    def __init__(
+        self, document: Any, url: str | None = None, fetch_document: Callable[[str], Any] | None = None
+    ) -> None:
+        self.document = document
+        self.url = url
+        self.fetch_document = fetch_document
+        self._documents: dict[str | None, Any] = {url: document}
+        # sections and document urls by reference and the url of the document the reference is in
+        self._lookups: dict[tuple[str, str | None], tuple[Any, str | None]] = {}
+        # resolved sections by the id of the original section; the original is kept, so its id cannot be reused
+        self._resolved: dict[int, tuple[Any, Any]] = {}
+
+    def get_document(self, url: str | None) -> Any:
+        """
+        Returns the document at a url, loading it once per resolver.
+
+        :raises: openapi_tester.exceptions.OpenAPISchemaError when the document cannot be loaded
+        """
+        if url not in self._documents:
+            if url is None or self.fetch_document is None:
+                raise OpenAPISchemaError(f"Cannot load the referenced document `{url}`.")
+            try:
+                self._documents[url] = self.fetch_document(url)
+            except Exception as e:
+                raise OpenAPISchemaError(f"Cannot load the referenced document `{url}`: {e}") from e
+        return self._documents[url]
+
+    def lookup(self, reference: str, url: str | None = None) -> tuple[Any, str | None]:
+        """
+        Returns the section a reference points to, without resolving it, and the url of the document it is in. Lookups
+        are memoized, so each reference is looked up once.
+
+        :raises: openapi_tester.exceptions.OpenAPISchemaError when the reference cannot be resolved
+        """
+        cached = self._lookups.get((reference, url))
+        if cached is not None:
+            return cached
+        document_reference, _, fragment = reference.partition("#")
+        document_url = urljoin(url or "", document_reference) if document_reference else url
+        document = self.get_document(document_url)
+        try:
+            section = resolve_fragment(document, unquote(fragment))
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            raise OpenAPISchemaError(f"Cannot resolve the reference `{reference}`: {e!r} not found.") from e
+        cached = self._lookups[(reference, url)] = (section, document_url)
+        return cached
+
+    def follow(self, node: Any, url: str | None = None) -> tuple[Any, str | None]:
+        """
+        Follows a reference, and any references it points to in turn, to the first section that is not a reference.
+        Returns that section, without resolving it, and the url of the document it is in.
+
+        :raises: openapi_tester.exceptions.OpenAPISchemaError for references that cannot be resolved, or lead to a loop
+            of references
+        """
+        url = url or self.url
+        reference = node.get("$ref") if isinstance(node, dict) else None
+        followed: set[int] = set()
+        while isinstance(node, dict) and isinstance(node.get("$ref"), str):
+            if id(node) in followed:
+                raise OpenAPISchemaError(f"The reference `{reference}` leads to a loop of references.")
+            followed.add(id(node))
+            node, url = self.lookup(node["$ref"], url)
+        return node, url
+
+    def resolve(self, node: Any, url: str | None = None) -> Any:
+        """
+        Returns a section with all of its references resolved. ``url`` is the url of the document the section is in,
+        and defaults to the url of the resolved document.
+
+        :raises: openapi_tester.exceptions.OpenAPISchemaError for references that cannot be resolved
+        """
+        return self._resolve(node, url or self.url)
+
+    def _resolve(self, node: Any, url: str | None) -> Any:
+        if not isinstance(node, (dict, list)):
+            return node
+        cached = self._resolved.get(id(node))
+        if cached is not None:
+            return cached[1]
+        if isinstance(node, dict) and isinstance(node.get("$ref"), str):
+            resolved = self._resolve(*self.follow(node, url))
+            self._resolved[id(node)] = (node, resolved)
+            return resolved
+        # register the copy before descending into the section, so circular references point back to it
+        if isinstance(node, dict):
+            resolved_dict: dict = {}
+            self._resolved[id(node)] = (node, resolved_dict)
+            self._resolved[id(resolved_dict)] = (resolved_dict, resolved_dict)
+            for key, value in node.items():
+                resolved_dict[key] = self._resolve(value, url)
+            return resolved_dict
+        resolved_list: list = []
+        self._resolved[id(node)] = (node, resolved_list)
+        self._resolved[id(resolved_list)] = (resolved_list, resolved_list)
+        resolved_list.extend(self._resolve(value, url) for value in node)
+        return resolved_list
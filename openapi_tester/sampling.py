@@ -0,0 +1,153 @@
+""" Sampling module - policies that select which items of large collections are validated """
+from __future__ import annotations
+
+import random
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Sequence
+
+
+class SamplingPolicy:
+    """
+    Selects the items of a collection that are validated: the items of arrays, and the values of objects that are
+    validated through ``additionalProperties``.
+
+    The base policy validates every item.
+    """
+
+    validates_all = True
+
+    def select(self, count: int) -> Sequence[int]:
+        """
+        Returns the indices of the items to validate, in ascending order.
+
+        :param count: The number of items in the collection
+        """
+        return range(count)
+
+    # policies are compared by value, so testers reuse their compiled plans for equivalent policies
+    def __eq__(self, other: object) -> bool:
+        return type(self) is type(other) and vars(self) == vars(other)
+
+    def __hash__(self) -> int:
+        return hash((type(self), tuple(sorted(vars(self).items()))))
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}()"
+
+
+# the policy only names the base behaviour, so it adds no methods
+class SampleAll(SamplingPolicy):  # pylint: disable=too-few-public-methods
+    """
+    Validates every item. This is the default policy.
+    """
+
+
+class SampleFirst(SamplingPolicy):
+    """
+    Validates the first ``count`` items.
+    """
+
+    validates_all = False
+
+    def __init__(self, count: int) -> None:
+        if count < 1:
+            raise ValueError("count must be at least 1")
+        self.count = count
+
+    def select(self, count: int) -> Sequence[int]:
+        return range(min(count, self.count))
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.count})"
+
+
+class SampleEdges(SamplingPolicy):
+    """
+    Validates the first and last items, and ``random_count`` items picked at random in between.
+
+    Items are picked with a generator seeded with ``seed``, so a collection of a given size is always sampled the
+    same way, and failures are reproducible.
+    """
+
+    validates_all = False
+
+    def __init__(self, first: int = 1, last: int = 1, random_count: int = 10, seed: int = 0) -> None:
+        if min(first, last, random_count) < 0:
+            raise ValueError("first, last and random_count cannot be negative")
+        self.first = first
+        self.last = last
+        self.random_count = random_count
+        self.seed = seed
+
+    def select(self, count: int) -> Sequence[int]:
+        if count <= self.first + self.last + self.random_count:
+            return range(count)
+        middle = range(self.first, count - self.last)
+        picked = random.Random(self.seed).sample(middle, self.random_count)
+        return [*range(self.first), *sorted(picked), *range(count - self.last, count)]
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(first={self.first}, last={self.last}, random_count={self.random_count}, "
+            f"seed={self.seed})"
+        )
+
+
+class SampleStride(SamplingPolicy):
+    """
+    Validates every ``step``-th item, starting with the first.
+    """
+
+    validates_all = False
+
+    def __init__(self, step: int) -> None:
+        if step < 1:
+            raise ValueError("step must be at least 1")
+        self.step = step
+
+    def select(self, count: int) -> Sequence[int]:
+        return range(0, count, self.step)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.step})"
+
+
+class SamplingSummary:
+    """
+    Counts the collection items seen and validated during a validation.
+    """
+
+    def __init__(self) -> None:
+        self.collections = 0
+        self.items = 0
+        self.checked_items = 0
+
+    def record(self, items: int, checked_items: int) -> None:
+        self.collections += 1
+        self.items += items
+        self.checked_items += checked_items
+
+    def checkpoint(self) -> tuple[int, int, int]:
+        """
+        Returns the current counts, so the counts of a trial validation - like that of a oneOf option - can be
+        discarded when the data turns out not to match.
+        """
+        return self.collections, self.items, self.checked_items
+
+    def restore(self, checkpoint: tuple[int, int, int]) -> None:
+        self.collections, self.items, self.checked_items = checkpoint
+
+    @property
+    def skipped_items(self) -> int:
+        return self.items - self.checked_items
+
+    def __str__(self) -> str:
+        return f"Checked {self.checked_items} of {self.items} items in {self.collections} collections"
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(collections={self.collections}, items={self.items}, "
+            f"checked_items={self.checked_items})"
+        )
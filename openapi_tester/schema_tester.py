@@ -2,67 +2,58 @@
 from __future__ import annotations
 
 import re
-from itertools import chain
-from typing import TYPE_CHECKING, Any, Callable, cast
+from typing import TYPE_CHECKING, Any, Callable
 
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured, ValidationError
 from django.core.validators import URLValidator
 
-from openapi_tester.constants import (
-    INIT_ERROR,
-    UNDOCUMENTED_SCHEMA_SECTION_ERROR,
-    VALIDATE_ANY_OF_ERROR,
-    VALIDATE_EXCESS_RESPONSE_KEY_ERROR,
-    VALIDATE_MISSING_RESPONSE_KEY_ERROR,
-    VALIDATE_NONE_ERROR,
-    VALIDATE_ONE_OF_ERROR,
-    VALIDATE_WRITE_ONLY_RESPONSE_KEY_ERROR,
-)
-from openapi_tester.exceptions import DocumentationError, OpenAPISchemaError, UndocumentedSchemaSectionError
+from openapi_tester.compiler import RECURSIVE_ENGINE, SchemaCompiler
+from openapi_tester.constants import INIT_ERROR, JSON_MEDIA_TYPE_PATTERN, UNDOCUMENTED_SCHEMA_SECTION_ERROR
+from openapi_tester.exceptions import UndocumentedSchemaSectionError
 from openapi_tester.loaders import (
     DrfSpectacularSchemaLoader,
     DrfYasgSchemaLoader,
     StaticSchemaLoader,
     UrlStaticSchemaLoader,
 )
-from openapi_tester.utils import lazy_combinations, normalize_schema_section
-from openapi_tester.validators import (
-    validate_enum,
-    validate_format,
-    validate_max_items,
-    validate_max_length,
-    validate_max_properties,
-    validate_maximum,
-    validate_min_items,
-    validate_min_length,
-    validate_min_properties,
-    validate_minimum,
-    validate_multiple_of,
-    validate_pattern,
-    validate_type,
-    validate_unique_items,
-)
+from openapi_tester.sampling import SampleAll, SamplingSummary
+from openapi_tester.streaming import StreamingValidator
+from openapi_tester.utils import LRUCache
 
 if TYPE_CHECKING:
-    from typing import Optional
+    from typing import Iterator
 
     from rest_framework.response import Response
 
+    from openapi_tester.compiler import ValidationPlan
+    from openapi_tester.sampling import SamplingPolicy
+
+
+# The size of the chunks that bodies are validated in, in streaming mode
+STREAM_CHUNK_SIZE = 64 * 1024
+# The number of keys each case tester remembers as correctly cased
+VERIFIED_KEYS_CACHE_SIZE = 4096
 
-class SchemaTester:
+
+# the tester holds its configuration, plus the compilers and validation plans cached for it
+class SchemaTester:  # pylint: disable=too-many-instance-attributes
     """Schema Tester: this is the base class of the library."""
 
     loader: StaticSchemaLoader | DrfSpectacularSchemaLoader | DrfYasgSchemaLoader | UrlStaticSchemaLoader
     validators: list[Callable[[dict, Any], str | None]]
 
-    def __init__(
+    # sampling and engine are keyword-only settings, on top of the original arguments
+    def __init__(  # pylint: disable=too-many-arguments
         self,
         case_tester: Callable[[str], None] | None = None,
         ignore_case: list[str] | None = None,
         schema_file_path: str | None = None,
         validators: list[Callable[[dict, Any], str | None]] | None = None,
         field_key_map: dict[str, str] | None = None,
+        *,
+        sampling: SamplingPolicy | None = None,
+        engine: str | None = None,
     ) -> None:
         """
         Iterates through an OpenAPI schema object and API response to check that they match at every level.
@@ -70,11 +61,24 @@ class SchemaTester:
         :param case_tester: An optional callable that validates schema and response keys
         :param ignore_case: An optional list of keys for the case_tester to ignore
         :schema_file_path: The file path to an OpenAPI yaml or json file. Only passed when using a static schema loader
+        :param sampling: An optional policy that selects the items of arrays and additionalProperties objects that
+            are validated. All items are validated by default
+        :param engine: The validation engine: "recursive", or "iterative", which validates data of any nesting depth.
+            Defaults to the ``OPENAPI_TESTER_ENGINE`` setting, or "recursive". It can be changed later through the
+            ``engine`` attribute
         :raises: openapi_tester.exceptions.DocumentationError or ImproperlyConfigured
         """
         self.case_tester = case_tester
         self.ignore_case = ignore_case or []
+        self._verified_keys: dict[Callable[[str], None], LRUCache] = {}
         self.validators = validators or []
+        self.sampling = sampling or SampleAll()
+        self.sampling_summary = SamplingSummary()
+        self.engine: str = (
+            engine if engine is not None else getattr(settings, "OPENAPI_TESTER_ENGINE", RECURSIVE_ENGINE)
+        )
+        self._compilers: dict[tuple, SchemaCompiler] = {}
+        self._validation_plans: dict[tuple, ValidationPlan] = {}
 
         if schema_file_path is not None:
             try:
@@ -136,15 +140,25 @@ class SchemaTester:
         """
         schema = self.loader.get_schema()
         response_method = response.request["REQUEST_METHOD"].lower()  # type: ignore
-        parameterized_path, _ = self.loader.resolve_path(
+        parameterized_path = self.loader.resolve_parameterized_path(
             response.request["PATH_INFO"], method=response_method  # type: ignore
         )
+        response_schema = self.loader.sections.get_response_schema_index(schema).get(
+            (parameterized_path, response_method, str(response.status_code))
+        )
+        if response_schema is not None:
+            return self.loader.sections.resolve(response_schema)
+
+        # the lookup missed; walk the schema to produce a detailed error, or to handle responses without content
         paths_object = self.get_key_value(schema, "paths")
 
-        route_object = self.get_key_value(
-            paths_object,
-            parameterized_path,
-            f"\n\nUndocumented route {parameterized_path}.\n\nDocumented routes: " + "\n\t• ".join(paths_object.keys()),
+        route_object = self.loader.sections.resolve(
+            self.get_key_value(
+                paths_object,
+                parameterized_path,
+                f"\n\nUndocumented route {parameterized_path}.\n\nDocumented routes: "
+                + "\n\t• ".join(paths_object.keys()),
+            )
         )
 
         method_object = self.get_key_value(
@@ -178,7 +192,7 @@ class SchemaTester:
             )
             json_object = self.get_key_value(
                 content_object,
-                r"^application\/.*json$",
+                JSON_MEDIA_TYPE_PATTERN,
                 (
                     "\n\nNo `application/json` responses documented for method: "
                     f"{response_method}, path: {parameterized_path}"
@@ -199,32 +213,10 @@ class SchemaTester:
         return {}
 
     def handle_one_of(self, schema_section: dict, data: Any, reference: str, **kwargs: Any) -> None:
-        matches = 0
-        passed_schema_section_formats = set()
-        for option in schema_section["oneOf"]:
-            try:
-                self.test_schema_section(schema_section=option, data=data, reference=f"{reference}.oneOf", **kwargs)
-                matches += 1
-                passed_schema_section_formats.add(option.get("format"))
-            except DocumentationError:
-                continue
-        if matches == 2 and passed_schema_section_formats == {"date", "date-time"}:
-            # With Django v4, the datetime validator now parses normal
-            # date formats successfully, so a oneOf: date // datetime section
-            # will succeed twice where it used to succeed once.
-            return
-        if matches != 1:
-            raise DocumentationError(f"{VALIDATE_ONE_OF_ERROR.format(matches=matches)}\n\nReference: {reference}.oneOf")
+        self.get_compiler(**kwargs).compile_schema(schema_section).validate_one_of(data, reference)
 
     def handle_any_of(self, schema_section: dict, data: Any, reference: str, **kwargs: Any) -> None:
-        any_of: list[dict[str, Any]] = schema_section.get("anyOf", [])
-        for schema in chain(any_of, lazy_combinations(any_of)):
-            try:
-                self.test_schema_section(schema_section=schema, data=data, reference=f"{reference}.anyOf", **kwargs)
-                return
-            except DocumentationError:
-                continue
-        raise DocumentationError(f"{VALIDATE_ANY_OF_ERROR}\n\nReference: {reference}.anyOf")
+        self.get_compiler(**kwargs).compile_schema(schema_section).validate_any_of(data, reference)
 
     @staticmethod
     def test_is_nullable(schema_item: dict) -> bool:
@@ -265,9 +257,80 @@ class SchemaTester:
         ignore_case: list[str] | None = None,
     ) -> None:
         tester = case_tester or getattr(self, "case_tester", None)
-        ignore_case = [*self.ignore_case, *(ignore_case or [])]
-        if tester and key not in ignore_case:
+        if not tester or key in self.ignore_case or (ignore_case and key in ignore_case):
+            return
+        verified_keys = self.get_verified_keys(tester)
+        if verified_keys.get(key) is None:
             tester(key)
+            verified_keys.set(key, True)
+
+    def get_verified_keys(self, case_tester: Callable[[str], None]) -> LRUCache:
+        """
+        Returns the keys that passed a case tester, so each distinct key is only tested once.
+        """
+        verified_keys = self._verified_keys.get(case_tester)
+        if verified_keys is None:
+            verified_keys = self._verified_keys[case_tester] = LRUCache(VERIFIED_KEYS_CACHE_SIZE)
+        return verified_keys
+
+    def get_compiler(
+        self,
+        case_tester: Callable[[str], None] | None = None,
+        ignore_case: list[str] | None = None,
+        sampling: SamplingPolicy | None = None,
+    ) -> SchemaCompiler:
+        """
+        Returns the schema compiler for the effective case tester, ignored keys, validators, sampling policy and
+        engine.
+
+        Compilers are kept per configuration, so the sections a compiler normalizes, tests the casing of and compiles
+        are only processed once. Schema sections must be treated as read-only once they have been validated.
+        """
+        case_tester = case_tester or self.case_tester
+        sampling = sampling or self.sampling
+        # the key includes the tester's current configuration, which can change between validations
+        compiler_key = (
+            case_tester,
+            tuple(self.ignore_case),
+            tuple(ignore_case or []),
+            tuple(self.validators),
+            sampling,
+            self.engine,
+        )
+        compiler = self._compilers.get(compiler_key)
+        if compiler is None:
+            compiler = self._compilers[compiler_key] = SchemaCompiler(
+                self,
+                case_tester=case_tester,
+                ignore_case=frozenset((*self.ignore_case, *(ignore_case or ()))),
+                validators=self.validators,
+                sampling=sampling,
+                engine=self.engine,
+            )
+        return compiler
+
+    def get_validation_plan(
+        self,
+        schema_section: dict,
+        case_tester: Callable[[str], None] | None = None,
+        ignore_case: list[str] | None = None,
+        validators: list[Callable[[dict[str, Any], Any], str | None]] | None = None,
+        sampling: SamplingPolicy | None = None,
+    ) -> ValidationPlan:
+        """
+        Returns the validation plan for a response schema section.
+
+        Plans are cached per response section - i.e. per route, method and status code - and per effective
+        case_tester, ignore_case, validators, sampling policy and engine, so each operation's schema is only
+        interpreted once.
+        """
+        compiler = self.get_compiler(case_tester, ignore_case, sampling)
+        plan_key = (id(schema_section), compiler, tuple(validators or []))
+        cached_plan = self._validation_plans.get(plan_key)
+        if cached_plan is not None and cached_plan.schema_section is schema_section:
+            return cached_plan
+        plan = self._validation_plans[plan_key] = compiler.compile_schema(schema_section, validators=validators or [])
+        return plan
 
     def test_schema_section(
         self,
@@ -278,58 +341,12 @@ class SchemaTester:
         **kwargs: Any,
     ) -> None:
         """
-        This method orchestrates the testing of a schema section
-        """
-        if data is None:
-            if self.test_is_nullable(schema_section):
-                # If data is None and nullable, we return early
-                return
-            raise DocumentationError(
-                f"{VALIDATE_NONE_ERROR}\n\n"
-                f"Reference: {reference}\n\n"
-                "Hint: Return a valid type, or document the value as nullable"
-            )
-        schema_section = normalize_schema_section(schema_section)
-        if "oneOf" in schema_section:
-            self.handle_one_of(schema_section=schema_section, data=data, reference=reference, **kwargs)
-            return
-        if "anyOf" in schema_section:
-            self.handle_any_of(schema_section=schema_section, data=data, reference=reference, **kwargs)
-            return
+        This method orchestrates the testing of a schema section.
 
-        schema_section_type = self.get_schema_type(schema_section)
-        if not schema_section_type:
-            return
-        combined_validators = cast(
-            "list[Callable[[dict, Any], Optional[str]]]",
-            [
-                validate_type,
-                validate_format,
-                validate_pattern,
-                validate_multiple_of,
-                validate_minimum,
-                validate_maximum,
-                validate_unique_items,
-                validate_min_length,
-                validate_max_length,
-                validate_min_items,
-                validate_max_items,
-                validate_max_properties,
-                validate_min_properties,
-                validate_enum,
-                *self.validators,
-                *(validators or []),
-            ],
-        )
-        for validator in combined_validators:
-            error = validator(schema_section, data)
-            if error:
-                raise DocumentationError(f"\n\n{error}\n\nReference: {reference}")
-
-        if schema_section_type == "object":
-            self.test_openapi_object(schema_section=schema_section, data=data, reference=reference, **kwargs)
-        elif schema_section_type == "array":
-            self.test_openapi_array(schema_section=schema_section, data=data, reference=reference, **kwargs)
+        The section is compiled once per tester configuration, so it must not be changed after it has been tested.
+        """
+        self.sampling_summary = SamplingSummary()
+        self.get_validation_plan(schema_section, validators=validators, **kwargs).validate(data, reference)
 
     def test_openapi_object(
         self,
@@ -339,69 +356,10 @@ class SchemaTester:
         case_tester: Callable[[str], None] | None = None,
         ignore_case: list[str] | None = None,
     ) -> None:
-        """
-        1. Validate that casing is correct for both response and schema
-        2. Check if any required key is missing from the response
-        3. Check if any response key is not in the schema
-        4. Validate sub-schema/nested data
-        """
-
-        properties = schema_section.get("properties", {})
-        write_only_properties = [key for key in properties.keys() if properties[key].get("writeOnly")]
-        required_keys = [key for key in schema_section.get("required", []) if key not in write_only_properties]
-        response_keys = data.keys()
-        additional_properties: bool | dict | None = schema_section.get("additionalProperties")
-        additional_properties_allowed = additional_properties is not None
-        if additional_properties_allowed and not isinstance(additional_properties, (bool, dict)):
-            raise OpenAPISchemaError("Invalid additionalProperties type")
-        for key in properties.keys():
-            self.test_key_casing(key, case_tester, ignore_case)
-            if key in required_keys and key not in response_keys:
-                raise DocumentationError(
-                    f"{VALIDATE_MISSING_RESPONSE_KEY_ERROR.format(missing_key=key)}\n\nReference: {reference}."
-                    f"object:key:{key}\n\nHint: Remove the key from your"
-                    " OpenAPI docs, or include it in your API response"
-                )
-        for key in response_keys:
-            self.test_key_casing(key, case_tester, ignore_case)
-            if key not in properties and not additional_properties_allowed:
-                raise DocumentationError(
-                    f"{VALIDATE_EXCESS_RESPONSE_KEY_ERROR.format(excess_key=key)}\n\nReference: {reference}.object:key:"
-                    f"{key}\n\nHint: Remove the key from your API response, or include it in your OpenAPI docs"
-                )
-            if key in write_only_properties:
-                raise DocumentationError(
-                    f"{VALIDATE_WRITE_ONLY_RESPONSE_KEY_ERROR.format(write_only_key=key)}\n\nReference: {reference}"
-                    f".object:key:{key}\n\nHint: Remove the key from your API response, or remove the "
-                    '"WriteOnly" restriction'
-                )
-        for key, value in data.items():
-            if key in properties:
-                self.test_schema_section(
-                    schema_section=properties[key],
-                    data=value,
-                    reference=f"{reference}.object:key:{key}",
-                    case_tester=case_tester,
-                    ignore_case=ignore_case,
-                )
-            elif isinstance(additional_properties, dict):
-                self.test_schema_section(
-                    schema_section=additional_properties,
-                    data=value,
-                    reference=f"{reference}.object:key:{key}",
-                    case_tester=case_tester,
-                    ignore_case=ignore_case,
-                )
+        self.get_compiler(case_tester, ignore_case).compile_schema(schema_section).validate_object(data, reference)
 
     def test_openapi_array(self, schema_section: dict[str, Any], data: dict, reference: str, **kwargs: Any) -> None:
-        for datum in data:
-            self.test_schema_section(
-                # the items keyword is required in arrays
-                schema_section=schema_section["items"],
-                data=datum,
-                reference=f"{reference}.array.item",
-                **kwargs,
-            )
+        self.get_compiler(**kwargs).compile_schema(schema_section).validate_array(data, reference)  # type: ignore
 
     def validate_response(
         self,
@@ -409,6 +367,9 @@ class SchemaTester:
         case_tester: Callable[[str], None] | None = None,
         ignore_case: list[str] | None = None,
         validators: list[Callable[[dict[str, Any], Any], str | None]] | None = None,
+        *,
+        sampling: SamplingPolicy | None = None,
+        stream: bool = False,
     ) -> None:
         """
         Verifies that an OpenAPI schema definition matches an API response.
@@ -417,14 +378,38 @@ class SchemaTester:
         :param case_tester: Optional Callable that checks a string's casing
         :param ignore_case: Optional list of keys to ignore in case testing
         :param validators: Optional list of validator functions
+        :param sampling: Optional policy that selects the items of large collections to validate. A summary of the
+            items checked is available as ``sampling_summary`` after the call
+        :param stream: Whether to validate the response body incrementally, as it is parsed, instead of loading it
+            first. Streaming responses are always validated this way, and are consumed by the validation. Every item
+            is validated in streaming mode, so it cannot be combined with a sampling policy that skips items. Custom
+            validators receive whole values, so objects and arrays they apply to are loaded into memory to be
+            validated; validators that apply to the response's top-level section make the whole body load
         :raises: ``openapi_tester.exceptions.DocumentationError`` for inconsistencies in the API response and schema.
                  ``openapi_tester.exceptions.CaseError`` for case errors.
+                 ValueError for a sampling policy that skips items in streaming mode
         """
+        stream = stream or getattr(response, "streaming", False)
+        if stream and not (sampling or self.sampling).validates_all:
+            raise ValueError("Sampling policies that skip items cannot be applied in streaming mode.")
         response_schema = self.get_response_schema_section(response)
-        self.test_schema_section(
-            schema_section=response_schema,
-            data=response.json() if response.data is not None else {},  # type: ignore
-            case_tester=case_tester or self.case_tester,
-            ignore_case=ignore_case,
-            validators=validators,
+        plan = self.get_validation_plan(
+            response_schema, case_tester=case_tester, ignore_case=ignore_case, validators=validators, sampling=sampling
         )
+        self.sampling_summary = SamplingSummary()
+        if stream:
+            StreamingValidator(plan).validate(self.get_response_chunks(response))
+            return
+        plan.validate(response.json() if response.data is not None else {})  # type: ignore
+
+    @staticmethod
+    def get_response_chunks(response: Response) -> Iterator[bytes]:
+        """
+        Returns the body of a response in chunks.
+        """
+        if getattr(response, "streaming", False):
+            yield from response.streaming_content  # type: ignore
+            return
+        content = memoryview(response.content)
+        for start in range(0, len(content), STREAM_CHUNK_SIZE):
+            yield bytes(content[start : start + STREAM_CHUNK_SIZE])
@@ -0,0 +1,491 @@
+""" Streaming module - validates JSON documents incrementally, as their bytes arrive """
+from __future__ import annotations
+
+import codecs
+import re
+from dataclasses import dataclass, field
+from json import JSONDecodeError, decoder
+from typing import TYPE_CHECKING, cast
+
+from openapi_tester.compiler import BUILT_IN_VALIDATORS
+from openapi_tester.exceptions import DocumentationError
+from openapi_tester.utils import render_reference
+from openapi_tester.validators import (
+    validate_max_items,
+    validate_max_properties,
+    validate_min_items,
+    validate_min_properties,
+)
+
+if TYPE_CHECKING:
+    from typing import Any, Callable, Iterable, Tuple, Union
+
+    from openapi_tester.compiler import ValidationPlan
+    from openapi_tester.utils import Reference
+
+    # A location in the document, as a parent-linked tuple of its parent location and a key or index
+    JSONPath = Union[str, Tuple[Any, Union[str, int]]]
+
+# The string scanner of the json module, which uses its C implementation when available; it is not part of the module's
+# typed interface
+scanstring = cast("Callable[..., Tuple[str, int]]", vars(decoder)["scanstring"])
+
+# Parser events
+START_MAP = "start_map"
+MAP_KEY = "map_key"
+END_MAP = "end_map"
+START_ARRAY = "start_array"
+END_ARRAY = "end_array"
+VALUE = "value"
+
+# Tokenizer states: what the next token can be
+_EXPECT_VALUE = 0
+_EXPECT_FIRST_VALUE = 1  # a value, or the end of an empty array
+_EXPECT_KEY = 2
+_EXPECT_FIRST_KEY = 3  # a key, or the end of an empty object
+_EXPECT_COLON = 4
+_EXPECT_SEPARATOR = 5  # a comma, or the end of the enclosing container
+_EXPECT_END = 6
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_NUMBER = re.compile(r"-?(?:0|[1-9]\d*)(\.\d+)?([eE][-+]?\d+)?")
+# what can follow a number at the end of a chunk, when the number is not complete yet
+_NUMBER_TAIL = re.compile(r"(?:\.|[eE][-+]?)?")
+# strings without escape sequences, which make up most strings
+_PLAIN_STRING = re.compile(r'"([^"\\\x00-\x1f]*)"')
+_LITERALS = {"t": ("true", True), "f": ("false", False), "n": ("null", None)}
+# the longest a string token can be cut short inside of an escape sequence, like \uXXXX
+_MAX_ESCAPE_LENGTH = 6
+
+# Checks that only depend on the length of a container, and can be applied without holding its items
+_LENGTH_CHECKS = (
+    validate_min_items,
+    validate_max_items,
+    validate_min_properties,
+    validate_max_properties,
+)
+# Keywords that need a container's items to be validated, in which case the container is materialized
+_MATERIALIZED_KEYWORDS = ("enum", "uniqueItems")
+
+
+class JSONTokenizer:
+    """
+    An incremental JSON parser, that turns chunks of a UTF-8 encoded document into parser events.
+
+    Only the current, incomplete token is buffered between chunks, so memory use does not depend on the size of the
+    document, only on its nesting depth and the length of its longest token.
+    """
+
+    def __init__(self) -> None:
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.offset = 0
+        self.state = _EXPECT_VALUE
+        self.containers: list[str] = []
+        # the handler of each tokenizer state, by state
+        self._handlers: tuple[Callable[[str, int, bool, list[tuple[str, Any]]], int | None], ...] = (
+            self._handle_value,  # _EXPECT_VALUE
+            self._handle_value,  # _EXPECT_FIRST_VALUE
+            self._handle_key,  # _EXPECT_KEY
+            self._handle_key,  # _EXPECT_FIRST_KEY
+            self._handle_colon,  # _EXPECT_COLON
+            self._handle_separator,  # _EXPECT_SEPARATOR
+            self._handle_end,  # _EXPECT_END
+        )
+
+    def feed(self, chunk: bytes) -> list[tuple[str, Any]]:
+        """
+        Returns the events of the tokens completed by a chunk.
+
+        :raises: ValueError for invalid JSON
+        """
+        self.buffer += self.decoder.decode(chunk)
+        return self._tokenize(final=False)
+
+    def close(self) -> list[tuple[str, Any]]:
+        """
+        Returns the events of the remaining tokens, at the end of the document.
+
+        :raises: ValueError for invalid or incomplete JSON
+        """
+        self.buffer += self.decoder.decode(b"", final=True)
+        events = self._tokenize(final=True)
+        if self.state != _EXPECT_END:
+            raise ValueError(f"Invalid JSON: unexpected end of document at position {self.offset}")
+        return events
+
+    def _error(self, index: int) -> ValueError:
+        return ValueError(f"Invalid JSON: unexpected {self.buffer[index]!r} at position {self.offset + index}")
+
+    def _end_value(self) -> None:
+        self.state = _EXPECT_SEPARATOR if self.containers else _EXPECT_END
+
+    def _tokenize(self, final: bool) -> list[tuple[str, Any]]:
+        events: list[tuple[str, Any]] = []
+        buffer = self.buffer
+        length = len(buffer)
+        handlers = self._handlers
+        index = 0
+        while True:
+            index = _WHITESPACE.match(buffer, index).end()  # type: ignore
+            if index >= length:
+                break
+            next_index = handlers[self.state](buffer, index, final, events)
+            if next_index is None:
+                # the token is cut short by the end of the chunk
+                break
+            index = next_index
+        self.buffer = buffer[index:]
+        self.offset += index
+        return events
+
+    # State handlers: each handles the token at an index, and returns the index after it, or None when the token is
+    # cut short by the end of the chunk
+
+    def _handle_value(self, buffer: str, index: int, final: bool, events: list[tuple[str, Any]]) -> int | None:
+        char = buffer[index]
+        token: tuple[Any, int] | None
+        if char == "{":
+            self.containers.append("{")
+            events.append((START_MAP, None))
+            self.state = _EXPECT_FIRST_KEY
+            return index + 1
+        if char == "[":
+            self.containers.append("[")
+            events.append((START_ARRAY, None))
+            self.state = _EXPECT_FIRST_VALUE
+            return index + 1
+        if char == "]" and self.state == _EXPECT_FIRST_VALUE:
+            return self._end_container(index, END_ARRAY, events)
+        if char == '"':
+            token = self._scan_string(buffer, index, final)
+        elif char == "-" or char.isdigit():
+            token = self._scan_number(buffer, index, final)
+        elif char in _LITERALS:
+            token = self._scan_literal(buffer, index, final)
+        else:
+            raise self._error(index)
+        if token is None:
+            return None
+        value, index = token
+        events.append((VALUE, value))
+        self._end_value()
+        return index
+
+    def _handle_key(self, buffer: str, index: int, final: bool, events: list[tuple[str, Any]]) -> int | None:
+        char = buffer[index]
+        if char == "}" and self.state == _EXPECT_FIRST_KEY:
+            return self._end_container(index, END_MAP, events)
+        if char != '"':
+            raise self._error(index)
+        token = self._scan_string(buffer, index, final)
+        if token is None:
+            return None
+        key, index = token
+        events.append((MAP_KEY, key))
+        self.state = _EXPECT_COLON
+        return index
+
+    def _handle_colon(self, buffer: str, index: int, _final: bool, _events: list[tuple[str, Any]]) -> int | None:
+        if buffer[index] != ":":
+            raise self._error(index)
+        self.state = _EXPECT_VALUE
+        return index + 1
+
+    def _handle_separator(self, buffer: str, index: int, _final: bool, events: list[tuple[str, Any]]) -> int | None:
+        char = buffer[index]
+        container = self.containers[-1]
+        if char == ",":
+            self.state = _EXPECT_KEY if container == "{" else _EXPECT_VALUE
+            return index + 1
+        if char == "}" and container == "{":
+            return self._end_container(index, END_MAP, events)
+        if char == "]" and container == "[":
+            return self._end_container(index, END_ARRAY, events)
+        raise self._error(index)
+
+    def _handle_end(self, buffer: str, index: int, _final: bool, _events: list[tuple[str, Any]]) -> int | None:
+        raise self._error(index)
+
+    def _end_container(self, index: int, event: str, events: list[tuple[str, Any]]) -> int:
+        self.containers.pop()
+        events.append((event, None))
+        self._end_value()
+        return index + 1
+
+    def _scan_number(self, buffer: str, index: int, final: bool) -> tuple[int | float, int] | None:
+        """
+        Returns a number token and the index after it, or None when the number may continue in the next chunk.
+        """
+        match = _NUMBER.match(buffer, index)
+        if not final and (_NUMBER_TAIL.fullmatch(buffer, match.end()) if match else buffer[index:] == "-"):
+            return None
+        if match is None:
+            raise self._error(index)
+        number = match.group()
+        return float(number) if match.group(1) or match.group(2) else int(number), match.end()
+
+    def _scan_literal(self, buffer: str, index: int, final: bool) -> tuple[bool | None, int] | None:
+        """
+        Returns the value of a true, false or null token and the index after it, or None when the token is cut short
+        by the end of the chunk.
+        """
+        literal, literal_value = _LITERALS[buffer[index]]
+        if buffer.startswith(literal, index):
+            return literal_value, index + len(literal)
+        if not final and literal.startswith(buffer[index:]):
+            return None
+        raise self._error(index)
+
+    def _scan_string(self, buffer: str, index: int, final: bool) -> tuple[str, int] | None:
+        """
+        Returns a string token and the index after it, or None when the token is cut short by the end of the chunk.
+        """
+        match = _PLAIN_STRING.match(buffer, index)
+        if match:
+            return match.group(1), match.end()
+        try:
+            return scanstring(buffer, index + 1)
+        except JSONDecodeError as e:
+            if not final and (e.msg.startswith("Unterminated string") or e.pos >= len(buffer) - _MAX_ESCAPE_LENGTH):
+                return None
+            raise ValueError(f"Invalid JSON: {e.msg} at position {self.offset + e.pos}") from e
+
+
+def render_json_path(path: JSONPath) -> str:
+    """
+    Renders a location in a document, like ``(("$", 42), "owner")``, as a JSON path, like ``$[42].owner``.
+    """
+    segments: list[str] = []
+    while isinstance(path, tuple):
+        path, segment = path
+        if isinstance(segment, int):
+            segments.append(f"[{segment}]")
+        else:
+            segments.append(f".{segment}" if segment.isidentifier() else f"[{segment!r}]")
+    segments.append(path)
+    return "".join(reversed(segments))
+
+
+class _Elided:
+    """
+    Stands in for a container that was validated item by item, in the errors of length checks.
+    """
+
+    def __init__(self, length: int, opening: str, closing: str) -> None:
+        self.length = length
+        self.opening = opening
+        self.closing = closing
+
+    def __len__(self) -> int:
+        return self.length
+
+    def keys(self) -> range:
+        return range(self.length)
+
+    def __str__(self) -> str:
+        return f"{self.opening}... {self.length} items{self.closing}"
+
+
+# a frame records the state of one open container, which the validator updates as events arrive
+@dataclass
+class _Frame:  # pylint: disable=too-many-instance-attributes
+    """
+    An open container: the plan it is validated against, and where it is in the document.
+    """
+
+    is_object: bool
+    plan: ValidationPlan | None
+    reference: Reference
+    path: JSONPath
+    keys: dict[str, None] = field(default_factory=dict)
+    length: int = 0
+    key: str = ""
+    items_plan: ValidationPlan | None = field(init=False, default=None)
+
+    def __post_init__(self) -> None:
+        if self.plan is not None and not self.is_object:
+            # the items keyword is required in arrays
+            self.items_plan = self.plan.sub_plan(self.plan.section["items"])
+
+
+# the builder only needs to be fed events, so it has a single method
+class _ValueBuilder:  # pylint: disable=too-few-public-methods
+    """
+    Builds a value from parser events, for sub-trees that can only be validated as a whole.
+    """
+
+    def __init__(self, plan: ValidationPlan, reference: Reference, path: JSONPath) -> None:
+        self.plan = plan
+        self.reference = reference
+        self.path = path
+        self.containers: list[Any] = []
+        self.keys: list[str] = []
+
+    def add(self, event: str, value: Any) -> tuple[bool, Any]:
+        """
+        Adds an event to the value, and returns whether the value is complete, and the value.
+        """
+        if event == MAP_KEY:
+            self.keys.append(value)
+            return False, None
+        if event in (START_MAP, START_ARRAY):
+            self.containers.append({} if event == START_MAP else [])
+            return False, None
+        if event in (END_MAP, END_ARRAY):
+            value = self.containers.pop()
+        if not self.containers:
+            return True, value
+        parent = self.containers[-1]
+        if isinstance(parent, dict):
+            parent[self.keys.pop()] = value
+        else:
+            parent.append(value)
+        return False, None
+
+
+class StreamingValidator:
+    """
+    Validates a JSON document against a validation plan, as the document is parsed.
+
+    Values are validated as soon as they are complete, and objects and arrays are validated key by key and item by
+    item, so memory use is proportional to the nesting depth of the document rather than to its size. Sub-trees that
+    can only be validated as a whole - oneOf and anyOf sections, and objects and arrays with an enum, uniqueItems or
+    custom validators - are built in memory, and validated once complete.
+
+    Errors include the JSON path of the value that failed validation.
+    """
+
+    def __init__(self, plan: ValidationPlan) -> None:
+        self.plan = plan
+        self.tokenizer = JSONTokenizer()
+        self.frames: list[_Frame] = []
+        self.builder: _ValueBuilder | None = None
+        self.complete = False
+
+    def validate(self, chunks: Iterable[bytes]) -> None:
+        """
+        Validates a document, given as an iterable of byte chunks.
+
+        :raises: ``openapi_tester.exceptions.DocumentationError`` for inconsistencies in the data and schema.
+                 ValueError for invalid JSON
+        """
+        for chunk in chunks:
+            self.feed(chunk)
+        self.close()
+
+    def feed(self, chunk: bytes) -> None:
+        for event, value in self.tokenizer.feed(chunk):
+            self.handle(event, value)
+
+    def close(self) -> None:
+        if not self.complete and not self.tokenizer.buffer.strip():
+            # like validate_response, an empty body is validated as an empty object
+            self.plan.validate({})
+            return
+        for event, value in self.tokenizer.close():
+            self.handle(event, value)
+
+    @staticmethod
+    def _fail(error: DocumentationError, path: JSONPath) -> DocumentationError:
+        error.args = (f"{error.args[0] if error.args else ''}\n\nJSON path: {render_json_path(path)}", *error.args[1:])
+        return error
+
+    def handle(self, event: str, value: Any) -> None:
+        builder = self.builder
+        if builder is not None:
+            complete, built_value = builder.add(event, value)
+            if complete:
+                self.builder = None
+                try:
+                    builder.plan.validate(built_value, builder.reference)
+                except DocumentationError as e:
+                    raise self._fail(e, builder.path) from None
+            return
+        if event == MAP_KEY:
+            self.frames[-1].key = value
+            return
+        if event in (END_MAP, END_ARRAY):
+            self.end_container(self.frames.pop())
+            return
+        plan, reference, path = self.next_value()
+        if event == VALUE:
+            if plan is not None:
+                try:
+                    plan.validate(value, reference)
+                except DocumentationError as e:
+                    raise self._fail(e, path) from None
+            return
+        is_object = event == START_MAP
+        if plan is not None and plan.validate_section == plan.validate_nothing:
+            plan = None
+        if plan is not None and not self.is_streamable(plan, is_object):
+            self.builder = _ValueBuilder(plan, reference, path)
+            self.builder.add(event, value)
+            return
+        self.frames.append(_Frame(is_object, plan, reference, path))
+
+    def next_value(self) -> tuple[ValidationPlan | None, Reference, JSONPath]:
+        """
+        Returns the plan, reference and JSON path of the value that starts next.
+        """
+        if not self.frames:
+            if self.complete:
+                raise ValueError("Invalid JSON: more than one document")
+            self.complete = True
+            return self.plan, "init", "$"
+        frame = self.frames[-1]
+        if not frame.is_object:
+            path: JSONPath = (frame.path, frame.length)
+            frame.length += 1
+            return frame.items_plan, (frame.reference, ".array.item"), path
+        key = frame.key
+        frame.keys[key] = None
+        path = (frame.path, key)
+        if frame.plan is None:
+            return None, "", path
+        properties, _, _, additional_properties = frame.plan.object_rules
+        reference = (frame.reference, ".object:key:", key)
+        if key in properties:
+            return frame.plan.sub_plan(properties[key]), reference, path
+        if isinstance(additional_properties, dict):
+            return frame.plan.sub_plan(additional_properties), reference, path
+        # undocumented keys are reported once the object is complete, with its other key errors
+        return None, reference, path
+
+    @staticmethod
+    def is_streamable(plan: ValidationPlan, is_object: bool) -> bool:
+        """
+        Returns whether a container can be validated item by item: its plan has to be of the container's type, which
+        makes its type check pass, and none of its checks can need its items. Custom validators receive the whole
+        container, so containers they apply to are not streamable.
+        """
+        expected_section = plan.validate_typed_object if is_object else plan.validate_typed_array
+        return (
+            plan.validate_section == expected_section
+            and not any(keyword in plan.section for keyword in _MATERIALIZED_KEYWORDS)
+            and all(check.func in BUILT_IN_VALIDATORS for check in plan.checks)  # type: ignore
+        )
+
+    def end_container(self, frame: _Frame) -> None:
+        plan = frame.plan
+        if plan is None:
+            return
+        # every item is validated in streaming mode, see SchemaTester.validate_response
+        sampling_summary = plan.compiler.tester.sampling_summary
+        if not frame.is_object and frame.length:
+            sampling_summary.record(frame.length, frame.length)
+        elif frame.is_object and isinstance(plan.object_rules[3], dict):
+            additional_count = len(frame.keys) - len(plan.object_rules[0].keys() & frame.keys.keys())
+            sampling_summary.record(additional_count, additional_count)
+        try:
+            elided = _Elided(len(frame.keys) if frame.is_object else frame.length, *("{}" if frame.is_object else "[]"))
+            for check in plan.checks:
+                if check.func in _LENGTH_CHECKS:  # type: ignore
+                    error = check(elided)
+                    if error:
+                        raise DocumentationError(f"\n\n{error}\n\nReference: {render_reference(frame.reference)}")
+            if frame.is_object:
+                plan.validate_keys(frame.keys, frame.reference)
+        except DocumentationError as e:
+            raise self._fail(e, frame.path) from None
@@ -3,19 +3,39 @@ Utils Module - this file contains utility functions used in multiple places.
 """
 from __future__ import annotations
 
-from copy import deepcopy
+from collections import OrderedDict
+from collections.abc import Mapping
 from itertools import chain, combinations
 from typing import TYPE_CHECKING
 
+from django.utils.functional import Promise
+
 if TYPE_CHECKING:
-    from typing import Any, Iterator, Sequence
+    from typing import Any, Hashable, Iterator, Sequence, Tuple, Union
+
+    # A location in the data, either rendered, or as a parent-linked tuple of its parent location and segments
+    Reference = Union[str, Tuple[Any, ...]]
 
 
-def merge_objects(dictionaries: Sequence[dict[str, Any]]) -> dict[str, Any]:
+def merge_objects(
+    dictionaries: Sequence[dict[str, Any]], memo: dict[tuple[int, ...], tuple[Sequence, dict]] | None = None
+) -> dict[str, Any]:
     """
     Deeply merge objects.
+
+    Each combination of objects is merged once, so objects that are shared, or circular, are merged to shared, or
+    circular, objects.
     """
+    if memo is None:
+        memo = {}
+    memo_key = tuple(id(dictionary) for dictionary in dictionaries)
+    cached = memo.get(memo_key)
+    if cached is not None:
+        return cached[1]
     output: dict[str, Any] = {}
+    # register the output before merging sub-objects, so circular objects terminate; the merged objects are kept, so
+    # their ids cannot be reused
+    memo[memo_key] = (dictionaries, output)
     for dictionary in dictionaries:
         for key, value in dictionary.items():
             if key not in output:
@@ -26,31 +46,140 @@ def merge_objects(dictionaries: Sequence[dict[str, Any]]) -> dict[str, Any]:
                 output[key] = list(chain(output[key], value))
                 continue
             if isinstance(current_value, dict) and isinstance(value, dict):
-                output[key] = merge_objects([current_value, value])
+                output[key] = merge_objects([current_value, value], memo)
                 continue
     return output
 
 
-def normalize_schema_section(schema_section: dict[str, Any]) -> dict[str, Any]:
+_PLAIN_SCALAR_TYPES = frozenset((str, int, float, bool, type(None)))
+
+
+def _to_plain_key(key: Any) -> str:
+    # keys are converted the way json.dumps converts them
+    if isinstance(key, str):
+        return str.__str__(key)
+    if isinstance(key, bool) or key is None:
+        return {True: "true", False: "false", None: "null"}[key]
+    if isinstance(key, int):
+        return int.__repr__(key)
+    if isinstance(key, float):
+        return float.__repr__(key)
+    if isinstance(key, Promise):
+        return str(key)
+    raise TypeError(f"Keys must be str, int, float, bool or None, not {type(key).__name__}")
+
+
+def to_plain_data(value: Any, memo: dict[int, tuple[Any, Any]] | None = None) -> Any:
     """
-    Remove allOf and handle edge uses of oneOf.
+    Converts generated schema data to the plain dicts, lists and scalars json.loads would return for it, in a single
+    pass: mappings become dicts, tuples become lists, and lazy translation strings are evaluated.
+
+    Containers that appear in several places are converted once, and shared.
+
+    :raises: TypeError for values that have no JSON representation
     """
-    output: dict[str, Any] = deepcopy(schema_section)
-    if output.get("allOf"):
-        all_of = output.pop("allOf")
-        output = {**output, **merge_objects(all_of)}
-    if output.get("oneOf") and all(item.get("enum") for item in output["oneOf"]):
+    if type(value) in _PLAIN_SCALAR_TYPES:
+        return value
+    if memo is None:
+        memo = {}
+    # dict subclasses are checked first, since checking for other mappings is comparatively slow
+    is_mapping = isinstance(value, dict) or (not isinstance(value, (list, tuple)) and isinstance(value, Mapping))
+    if is_mapping or isinstance(value, (list, tuple)):
+        if id(value) in memo:
+            return memo[id(value)][1]
+        # the memo keeps a reference to the original value, so its id cannot be reused during the conversion
+        converted: Any
+        if is_mapping:
+            converted = {}
+            memo[id(value)] = (value, converted)
+            for key, item in value.items():
+                # an exact type check, since str subclasses are converted to plain strings
+                converted[key if type(key) is str else _to_plain_key(key)] = (  # pylint: disable=unidiomatic-typecheck
+                    item if type(item) in _PLAIN_SCALAR_TYPES else to_plain_data(item, memo)
+                )
+        else:
+            converted = []
+            memo[id(value)] = (value, converted)
+            converted.extend(item if type(item) in _PLAIN_SCALAR_TYPES else to_plain_data(item, memo) for item in value)
+        return converted
+    if isinstance(value, str):
+        return str.__str__(value)
+    if isinstance(value, int):
+        return int(value)
+    if isinstance(value, float):
+        return float(value)
+    if isinstance(value, Promise):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def normalize_schema_section(
+    schema_section: dict[str, Any], memo: dict[int, tuple[dict, dict]] | None = None
+) -> dict[str, Any]:
+    """
+    Remove allOf and handle edge uses of oneOf, in a section and all of its sub-sections.
+
+    Sections are never modified: a section that needs no normalization is returned as-is, and a normalized section is
+    a shallow copy that shares its unchanged sub-sections. Passing the same ``memo`` across calls makes sure that each
+    section, including sections shared between several parents, is normalized only once.
+    """
+    if memo is None:
+        memo = {}
+    cached = memo.get(id(schema_section))
+    if cached is not None:
+        return cached[1]
+    # register the section before descending into it, so self-referencing sections terminate
+    memo[id(schema_section)] = (schema_section, schema_section)
+    output = schema_section
+    all_of = output.get("allOf")
+    if all_of and isinstance(all_of, list):
+        # register the merged section before normalizing the merged entries, so circular references point to it
+        output = {}
+        memo[id(schema_section)] = (schema_section, output)
+        output.update((key, value) for key, value in schema_section.items() if key != "allOf")
+        output.update(merge_objects([normalize_schema_section(entry, memo) for entry in all_of]))
+    one_of = output.get("oneOf")
+    if one_of and isinstance(one_of, list) and all(item.get("enum") for item in one_of):
         # handle the way drf-spectacular is doing enums
-        one_of = output.pop("oneOf")
-        output = {**output, **merge_objects(one_of)}
+        if output is schema_section:
+            output = dict(schema_section)
+            memo[id(schema_section)] = (schema_section, output)
+        del output["oneOf"]
+        output.update(merge_objects(one_of))
     for key, value in output.items():
+        normalized_value = value
         if isinstance(value, dict):
-            output[key] = normalize_schema_section(value)
+            normalized_value = normalize_schema_section(value, memo)
         elif isinstance(value, list):
-            output[key] = [normalize_schema_section(entry) if isinstance(entry, dict) else entry for entry in value]
+            normalized_entries = [
+                normalize_schema_section(entry, memo) if isinstance(entry, dict) else entry for entry in value
+            ]
+            if any(entry is not original for entry, original in zip(normalized_entries, value)):
+                normalized_value = normalized_entries
+        if normalized_value is not value:
+            if output is schema_section:
+                output = dict(schema_section)
+            output[key] = normalized_value
+    memo[id(schema_section)] = (schema_section, output)
+    memo[id(output)] = (output, output)
     return output
 
 
+def resolve_fragment(document: Any, reference: str) -> Any:
+    """
+    Returns the value a local reference, like ``#/components/schemas/Pet``, points to in a document.
+
+    :raises: KeyError, IndexError or TypeError when the reference cannot be resolved
+    """
+    value = document
+    for key in reference.lstrip("#").split("/"):
+        if not key:
+            continue
+        key = key.replace("~1", "/").replace("~0", "~")
+        value = value[int(key)] if isinstance(value, list) else value[key]
+    return value
+
+
 def lazy_combinations(options_list: Sequence[dict[str, Any]]) -> Iterator[dict]:
     """
     Lazily evaluate possible combinations.
@@ -58,3 +187,56 @@ def lazy_combinations(options_list: Sequence[dict[str, Any]]) -> Iterator[dict]:
     for i in range(2, len(options_list) + 1):
         for combination in combinations(options_list, i):
             yield merge_objects(combination)
+
+
+def render_reference(reference: Reference) -> str:
+    """
+    Renders a location in the data, like ``("init", ".array.item")``, as text, like ``init.array.item``.
+
+    Locations are only rendered for error messages, so validation can build them as cheap tuples.
+    """
+    segments: list[str] = []
+    while isinstance(reference, tuple):
+        segments.extend(reversed(reference[1:]))
+        reference = reference[0]
+    segments.append(reference)
+    return "".join(reversed(segments))
+
+
+class LRUCache:
+    """
+    A size-bounded mapping that evicts its least recently used entries, and counts lookup hits and misses.
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
@@ -2,17 +2,22 @@
 from __future__ import annotations
 
 import base64
-import json
 import re
+import sys
+import warnings
 from typing import TYPE_CHECKING
 from uuid import UUID
 
+from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.core.signals import setting_changed
 from django.core.validators import EmailValidator, URLValidator, validate_ipv4_address, validate_ipv6_address
+from django.dispatch import receiver
 from django.utils.dateparse import parse_date, parse_datetime, parse_time
 
 from openapi_tester.constants import (
     INVALID_PATTERN_ERROR,
+    UNSAFE_PATTERN_WARNING,
     VALIDATE_ENUM_ERROR,
     VALIDATE_FORMAT_ERROR,
     VALIDATE_MAX_ARRAY_LENGTH_ERROR,
@@ -30,8 +35,43 @@ from openapi_tester.constants import (
 )
 from openapi_tester.exceptions import OpenAPISchemaError
 
+if sys.version_info >= (3, 11):
+    from re import _parser as sre_parse  # type: ignore[attr-defined]
+    from re._constants import (
+        ANY,
+        ASSERT,
+        ASSERT_NOT,
+        BRANCH,
+        CATEGORY,
+        IN,
+        LITERAL,
+        MAX_REPEAT,
+        MAXREPEAT,
+        MIN_REPEAT,
+        NOT_LITERAL,
+        SUBPATTERN,
+    )
+else:  # pragma: no cover - python < 3.11
+    import sre_parse  # pylint: disable=deprecated-module
+    from sre_constants import (  # pylint: disable=deprecated-module
+        ANY,
+        ASSERT,
+        ASSERT_NOT,
+        BRANCH,
+        CATEGORY,
+        IN,
+        LITERAL,
+        MAX_REPEAT,
+        MAXREPEAT,
+        MIN_REPEAT,
+        NOT_LITERAL,
+        SUBPATTERN,
+    )
+
 if TYPE_CHECKING:
-    from typing import Any, Callable
+    from typing import Any, Callable, Iterable, TypeVar
+
+    ValidatorT = TypeVar("ValidatorT", bound=Callable[[dict, Any], Any])
 
 
 def create_validator(validation_fn: Callable, wrap_as_validator: bool = False) -> Callable[[Any], bool]:
@@ -44,11 +84,88 @@ def create_validator(validation_fn: Callable, wrap_as_validator: bool = False) -
     return wrapped
 
 
+def create_tiered_validator(pre_check: Callable[[Any], bool | None], validator: Callable[[Any], bool]) -> Callable:
+    """
+    Combines a cheap pre-check with a full validator. The pre-check returns True or False when it can decide on a
+    value by itself, and None when it's ambiguous, in which case the full validator decides.
+    """
+
+    def tiered(value: Any) -> bool:
+        result = pre_check(value)
+        return validator(value) if result is None else result
+
+    return tiered
+
+
 number_format_validator = create_validator(
     lambda x: isinstance(x, float) if x != 0 else isinstance(x, (int, float)), True
 )
 
-base64_format_validator = create_validator(lambda x: base64.b64encode(base64.b64decode(x, validate=True)) == x)
+_BASE64 = re.compile(r"[A-Za-z0-9+/]*(=*)")
+
+
+def base64_pre_check(value: Any) -> bool | None:
+    """
+    Checks that a value decodes as base64 without decoding it: the value may only use the base64 alphabet, and its
+    padding has to complete the last group of four characters. Excess padding, including padding after a complete
+    group, is handled differently across python versions, so it is left to the decoder.
+    """
+    if not isinstance(value, str):
+        return False
+    match = _BASE64.fullmatch(value)
+    if match is None:
+        return False
+    padding = len(match.group(1))
+    if padding > 2:
+        return None
+    remainder = (len(value) - padding) % 4
+    if remainder == 0:
+        return None if padding else True
+    return padding == 4 - remainder
+
+
+# Common forms of emails, urls and uuids, which the full validators are guaranteed to accept
+_SIMPLE_EMAIL = re.compile(
+    r"[-!#$%&'*+/=?^_`{}|~0-9A-Za-z]+(?:\.[-!#$%&'*+/=?^_`{}|~0-9A-Za-z]+)*"
+    r"@(?:[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?\.)+[A-Za-z]{2,63}"
+)
+_SIMPLE_URL = re.compile(
+    r"(?:https?|ftps?)://((?:[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?\.)+[A-Za-z]{2,63})(?::[0-9]{1,4})?"
+    r"(?:[/?#]\S*)?"
+)
+_URL_SCHEMES = frozenset(URLValidator.schemes)
+_CANONICAL_UUID = re.compile(r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}")
+
+
+def email_pre_check(value: Any) -> bool | None:
+    if not isinstance(value, str) or "@" not in value:
+        return False
+    if len(value) <= 320 and _SIMPLE_EMAIL.fullmatch(value):
+        return True
+    return None
+
+
+def url_pre_check(value: Any) -> bool | None:
+    if not isinstance(value, str) or value.split("://", 1)[0].lower() not in _URL_SCHEMES:
+        return False
+    match = _SIMPLE_URL.fullmatch(value) if len(value) <= 2048 else None
+    if match and len(match.group(1)) <= 253:
+        return True
+    return None
+
+
+def uuid_pre_check(value: Any) -> bool | None:
+    if not isinstance(value, str):
+        return False
+    return True if _CANONICAL_UUID.fullmatch(value) else None
+
+
+email_format_validator = create_tiered_validator(email_pre_check, create_validator(EmailValidator()))
+url_format_validator = create_tiered_validator(url_pre_check, create_validator(URLValidator()))
+uuid_format_validator = create_tiered_validator(uuid_pre_check, create_validator(UUID))
+base64_format_validator = create_tiered_validator(
+    base64_pre_check, create_validator(lambda x: base64.b64decode(x, validate=True))
+)
 
 VALIDATOR_MAP: dict[str, Callable] = {
     # by type
@@ -65,15 +182,66 @@ VALIDATOR_MAP: dict[str, Callable] = {
     "date": create_validator(parse_date, True),
     "date-time": create_validator(parse_datetime, True),
     "double": number_format_validator,
-    "email": create_validator(EmailValidator()),
+    "email": email_format_validator,
     "float": number_format_validator,
     "ipv4": create_validator(validate_ipv4_address),
     "ipv6": create_validator(validate_ipv6_address),
     "time": create_validator(parse_time, True),
-    "uri": create_validator(URLValidator()),
-    "url": create_validator(URLValidator()),
-    "uuid": create_validator(UUID),
+    "uri": url_format_validator,
+    "url": url_format_validator,
+    "uuid": uuid_format_validator,
 }
+TYPE_NAMES = frozenset(("string", "file", "boolean", "integer", "number", "object", "array"))
+
+
+def register_format(
+    name: str, validation_fn: Callable[[Any], Any], pre_check: Callable[[Any], bool | None] | None = None
+) -> None:
+    """
+    Registers a validator for a string format, or replaces the validator of a built-in format.
+
+    :param name: The format, as used in the ``format`` keyword of schema sections
+    :param validation_fn: A function that returns a truthy value for valid values. Values that it returns a falsy
+        value for, or raises a ValueError or django ValidationError for, are invalid
+    :param pre_check: An optional cheap check that returns True or False when it can decide on a value by itself, and
+        None to defer to validation_fn
+    :raises: ValueError when name is a schema type
+    """
+    if name in TYPE_NAMES:
+        raise ValueError(f"Cannot register a format validator for the {name!r} type")
+    validator = create_validator(validation_fn, True)
+    VALIDATOR_MAP[name] = create_tiered_validator(pre_check, validator) if pre_check else validator
+
+
+def applies_to(*keywords: str, formats: Iterable[str] = ()) -> Callable[[ValidatorT], ValidatorT]:
+    """
+    Declares the schema keywords and formats a validator reacts to. The validator is then only called for schema
+    sections that contain one of the keywords, or one of the formats, while validators without a declaration are
+    called for every typed schema section.
+
+    Callable objects can declare their keywords and formats with ``schema_keywords`` and ``schema_formats``
+    attributes instead.
+    """
+
+    def declare(validator: ValidatorT) -> ValidatorT:
+        validator.schema_keywords = frozenset(keywords)  # type: ignore[attr-defined]
+        validator.schema_formats = frozenset(formats)  # type: ignore[attr-defined]
+        return validator
+
+    return declare
+
+
+def applies_to_section(validator: Callable, schema_section: dict[str, Any]) -> bool:
+    """
+    Checks whether a validator reacts to a schema section, according to its declared keywords and formats.
+    """
+    keywords = getattr(validator, "schema_keywords", None)
+    formats = getattr(validator, "schema_formats", None)
+    if keywords is None and formats is None:
+        return True
+    if any(keyword in schema_section for keyword in keywords or ()):
+        return True
+    return schema_section.get("format") in (formats or ())
 
 
 def validate_type(schema_section: dict[str, Any], data: Any) -> str | None:
@@ -88,6 +256,7 @@ def validate_type(schema_section: dict[str, Any], data: Any) -> str | None:
     return None
 
 
+@applies_to("format")
 def validate_format(schema_section: dict[str, Any], data: Any) -> str | None:
     schema_format: str = schema_section.get("format", "")
     if schema_format in VALIDATOR_MAP and not VALIDATOR_MAP[schema_format](data):
@@ -99,6 +268,7 @@ def validate_format(schema_section: dict[str, Any], data: Any) -> str | None:
     return None
 
 
+@applies_to("enum")
 def validate_enum(schema_section: dict[str, Any], data: Any) -> str | None:
     enum = schema_section.get("enum")
     if enum and data not in enum:
@@ -106,19 +276,116 @@ def validate_enum(schema_section: dict[str, Any], data: Any) -> str | None:
     return None
 
 
+# Compiled patterns, by pattern. Patterns skipped by the backtracking guard are stored as None.
+compiled_patterns: dict[str, re.Pattern | None] = {}
+
+
+@receiver(setting_changed)
+def clear_compiled_patterns(setting: str, **kwargs: Any) -> None:  # pylint: disable=unused-argument
+    if setting == "OPENAPI_TESTER_PATTERN_GUARD":
+        compiled_patterns.clear()
+
+
+def _flatten(subpattern: Any) -> list[tuple[Any, Any]]:
+    """
+    Returns the elements of a parsed pattern, with groups expanded in place.
+    """
+    elements = []
+    for operator, argument in subpattern:
+        if operator == SUBPATTERN:
+            elements.extend(_flatten(argument[-1]))
+        else:
+            elements.append((operator, argument))
+    return elements
+
+
+def _contains_unbounded_repeat(subpattern: Any) -> bool:
+    for operator, argument in subpattern:
+        if operator in (MAX_REPEAT, MIN_REPEAT):
+            if argument[1] == MAXREPEAT or _contains_unbounded_repeat(argument[2]):
+                return True
+        elif operator == SUBPATTERN:
+            if _contains_unbounded_repeat(argument[-1]):
+                return True
+        elif operator == BRANCH:
+            if any(_contains_unbounded_repeat(branch) for branch in argument[1]):
+                return True
+    return False
+
+
+def _has_ambiguous_repeat(subpattern: Any) -> bool:
+    fixed_operators = (LITERAL, NOT_LITERAL, IN, ANY, CATEGORY)
+    for operator, argument in subpattern:
+        if operator in (MAX_REPEAT, MIN_REPEAT):
+            _, max_repeat, item = argument
+            body = _flatten(item)
+            if (
+                max_repeat == MAXREPEAT
+                and _contains_unbounded_repeat(body)
+                and not any(element_operator in fixed_operators for element_operator, _ in body)
+            ):
+                # nothing delimits the iterations of the outer repeat, so input can be split between the inner
+                # and outer repeats in exponentially many ways
+                return True
+            if _has_ambiguous_repeat(item):
+                return True
+        elif operator == SUBPATTERN:
+            if _has_ambiguous_repeat(argument[-1]):
+                return True
+        elif operator == BRANCH:
+            if any(_has_ambiguous_repeat(branch) for branch in argument[1]):
+                return True
+        elif operator in (ASSERT, ASSERT_NOT):
+            if _has_ambiguous_repeat(argument[1]):
+                return True
+    return False
+
+
+def is_backtracking_prone(pattern: str) -> bool:
+    """
+    Checks whether a pattern repeats an unbounded quantifier without anything to delimit the repetitions, like
+    ``(a+)+``, which is the usual cause of catastrophic backtracking. Possessive quantifiers and atomic groups do not
+    backtrack, and are not flagged.
+    """
+    return _has_ambiguous_repeat(sre_parse.parse(pattern))
+
+
+def compile_pattern(pattern: str) -> re.Pattern | None:
+    """
+    Compiles a pattern, once per process.
+
+    With the ``OPENAPI_TESTER_PATTERN_GUARD`` setting enabled, patterns that are prone to catastrophic backtracking
+    are not compiled: a warning is emitted, and None is returned.
+
+    :raises: openapi_tester.exceptions.OpenAPISchemaError for invalid patterns
+    """
+    try:
+        return compiled_patterns[pattern]
+    except KeyError:
+        pass
+    try:
+        compiled_pattern: re.Pattern | None = re.compile(pattern)
+    except re.error as e:
+        raise OpenAPISchemaError(INVALID_PATTERN_ERROR.format(pattern=pattern)) from e
+    if getattr(settings, "OPENAPI_TESTER_PATTERN_GUARD", False) and is_backtracking_prone(pattern):
+        warnings.warn(UNSAFE_PATTERN_WARNING.format(pattern=pattern), stacklevel=2)
+        compiled_pattern = None
+    compiled_patterns[pattern] = compiled_pattern
+    return compiled_pattern
+
+
+@applies_to("pattern")
 def validate_pattern(schema_section: dict[str, Any], data: str) -> str | None:
     pattern = schema_section.get("pattern")
     if not pattern:
         return None
-    try:
-        compiled_pattern = re.compile(pattern)
-    except re.error as e:
-        raise OpenAPISchemaError(INVALID_PATTERN_ERROR.format(pattern=pattern)) from e
-    if not compiled_pattern.match(str(data)):
+    compiled_pattern = compile_pattern(pattern)
+    if compiled_pattern is not None and not compiled_pattern.match(str(data)):
         return VALIDATE_PATTERN_ERROR.format(data=data, pattern=pattern)
     return None
 
 
+@applies_to("multipleOf")
 def validate_multiple_of(schema_section: dict[str, Any], data: int | float) -> str | None:
     multiple = schema_section.get("multipleOf")
     if multiple and data % multiple != 0:
@@ -126,6 +393,7 @@ def validate_multiple_of(schema_section: dict[str, Any], data: int | float) -> s
     return None
 
 
+@applies_to("maximum")
 def validate_maximum(schema_section: dict[str, Any], data: int | float) -> str | None:
     maximum = schema_section.get("maximum")
     exclusive_maximum = schema_section.get("exclusiveMaximum")
@@ -136,6 +404,7 @@ def validate_maximum(schema_section: dict[str, Any], data: int | float) -> str |
     return None
 
 
+@applies_to("minimum")
 def validate_minimum(schema_section: dict[str, Any], data: int | float) -> str | None:
     minimum = schema_section.get("minimum")
     exclusive_minimum = schema_section.get("exclusiveMinimum")
@@ -146,15 +415,72 @@ def validate_minimum(schema_section: dict[str, Any], data: int | float) -> str |
     return None
 
 
+# Types of JSON values that can be hashed as is
+_SCALAR_TYPES = frozenset((str, int, float, type(None)))
+
+
+def structural_hash(value: Any) -> int:
+    """
+    Hashes JSON data by structure, so equal objects hash equally regardless of key order. Booleans hash differently
+    from the numbers they compare equal to.
+    """
+    value_type = type(value)
+    if value_type is dict:
+        return hash(
+            frozenset(
+                [
+                    (key, item) if type(item) in _SCALAR_TYPES else (key, structural_hash(item))
+                    for key, item in value.items()
+                ]
+            )
+        )
+    if value_type is list:
+        return hash(tuple(item if type(item) in _SCALAR_TYPES else structural_hash(item) for item in value))
+    if value_type is bool:
+        return hash((bool, value))
+    return hash(value)
+
+
+def structurally_equal(first: Any, second: Any) -> bool:
+    """
+    Compares JSON data like ``==``, except that booleans are not equal to numbers.
+    """
+    if isinstance(first, dict):
+        return (
+            isinstance(second, dict)
+            and first.keys() == second.keys()
+            and all(structurally_equal(item, second[key]) for key, item in first.items())
+        )
+    if isinstance(first, list):
+        return (
+            isinstance(second, list)
+            and len(first) == len(second)
+            and all(structurally_equal(*items) for items in zip(first, second))
+        )
+    if isinstance(first, bool) or isinstance(second, bool):
+        return type(first) is type(second) and first == second
+    return first == second
+
+
+@applies_to("uniqueItems")
 def validate_unique_items(schema_section: dict[str, Any], data: list[Any]) -> str | None:
     unique_items = schema_section.get("uniqueItems")
     if unique_items:
-        comparison_data = (json.dumps(item, sort_keys=True) if isinstance(item, dict) else item for item in data)
-        if len(set(comparison_data)) != len(data):
-            return VALIDATE_UNIQUE_ITEMS_ERROR.format(data=data)
+        hashes = [item if type(item) in _SCALAR_TYPES else structural_hash(item) for item in data]
+        if len(set(hashes)) == len(hashes):
+            # equal items hash equally, so without collisions every item is unique
+            return None
+        # items are bucketed by hash, and only compared to the items they share a bucket with
+        buckets: dict[Any, list[Any]] = {}
+        for item_hash, item in zip(hashes, data):
+            bucket = buckets.setdefault(item_hash, [])
+            if any(structurally_equal(item, other) for other in bucket):
+                return VALIDATE_UNIQUE_ITEMS_ERROR.format(data=data)
+            bucket.append(item)
     return None
 
 
+@applies_to("minLength")
 def validate_min_length(schema_section: dict[str, Any], data: str) -> str | None:
     min_length: int | None = schema_section.get("minLength")
     if min_length and len(data) < min_length:
@@ -162,6 +488,7 @@ def validate_min_length(schema_section: dict[str, Any], data: str) -> str | None
     return None
 
 
+@applies_to("maxLength")
 def validate_max_length(schema_section: dict[str, Any], data: str) -> str | None:
     max_length: int | None = schema_section.get("maxLength")
     if max_length and len(data) > max_length:
@@ -169,6 +496,7 @@ def validate_max_length(schema_section: dict[str, Any], data: str) -> str | None
     return None
 
 
+@applies_to("minItems")
 def validate_min_items(schema_section: dict[str, Any], data: list) -> str | None:
     min_length: int | None = schema_section.get("minItems")
     if min_length and len(data) < min_length:
@@ -176,6 +504,7 @@ def validate_min_items(schema_section: dict[str, Any], data: list) -> str | None
     return None
 
 
+@applies_to("maxItems")
 def validate_max_items(schema_section: dict[str, Any], data: list) -> str | None:
     max_length: int | None = schema_section.get("maxItems")
     if max_length and len(data) > max_length:
@@ -183,6 +512,7 @@ def validate_max_items(schema_section: dict[str, Any], data: list) -> str | None
     return None
 
 
+@applies_to("minProperties")
 def validate_min_properties(schema_section: dict[str, Any], data: dict) -> str | None:
     min_properties: int | None = schema_section.get("minProperties")
     if min_properties and len(data.keys()) < int(min_properties):
@@ -190,6 +520,7 @@ def validate_min_properties(schema_section: dict[str, Any], data: dict) -> str |
     return None
 
 
+@applies_to("maxProperties")
 def validate_max_properties(schema_section: dict[str, Any], data: dict) -> str | None:
     max_properties: int | None = schema_section.get("maxProperties")
     if max_properties and len(data.keys()) > int(max_properties):
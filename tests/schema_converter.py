@@ -31,10 +31,13 @@ class SchemaToPythonConverter:
     def convert_schema(self, schema: dict[str, Any]) -> Any:
         schema_type = schema.get("type", "object")
         schema = normalize_schema_section(schema)
+        # normalized sections can be shared, so they are copied rather than modified
         if "oneOf" in schema:
+            schema = dict(schema)
             one_of = schema.pop("oneOf")
             return self.convert_schema({**schema, **random.sample(one_of, 1)[0]})
         if "anyOf" in schema:
+            schema = dict(schema)
             any_of = schema.pop("anyOf")
             return self.convert_schema(
                 {**schema, **merge_objects(random.sample(any_of, random.randint(1, len(any_of))))}
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from openapi_tester.cache import CACHE_MAGIC, SchemaCache, get_project_source_paths
+from openapi_tester.loaders import (
+    BaseSchemaLoader,
+    DrfSpectacularSchemaLoader,
+    DrfYasgSchemaLoader,
+    StaticSchemaLoader,
+    schema_registry,
+)
+from openapi_tester.management.commands.build_openapi_schema_cache import Command
+from tests.utils import TEST_ROOT
+
+yaml_schema_path = str(TEST_ROOT) + "/schemas/manual_reference_schema.yaml"
+
+
+@pytest.fixture()
+def cache_dir(settings, tmp_path):
+    settings.OPENAPI_TESTER_CACHE_DIR = str(tmp_path)
+    schema_registry.clear()
+    return tmp_path
+
+
+def test_schema_cache_round_trip(tmp_path):
+    schema_cache = SchemaCache(tmp_path)
+    assert schema_cache.get("key") is None
+    schema_cache.set("key", {"openapi": "3.0.0", "paths": {}})
+    assert schema_cache.get("key") == {"openapi": "3.0.0", "paths": {}}
+    assert schema_cache.get("other key") is None
+
+
+@pytest.mark.parametrize(
+    "corrupt",
+    [
+        lambda content: content[:-10],  # truncated
+        lambda content: content[:-1] + b"x",  # checksum mismatch
+        lambda content: b"garbage" + content,  # unknown format
+        lambda content: b"",
+    ],
+)
+def test_schema_cache_discards_invalid_entries(tmp_path, corrupt):
+    schema_cache = SchemaCache(tmp_path)
+    schema_cache.set("key", {"openapi": "3.0.0"})
+    path = schema_cache.get_path("key")
+    assert path.read_bytes().startswith(CACHE_MAGIC)
+    path.write_bytes(corrupt(path.read_bytes()))
+    assert schema_cache.get("key") is None
+    assert not path.exists()
+
+
+def test_loader_uses_schema_cache(cache_dir):
+    schema = StaticSchemaLoader(yaml_schema_path).get_schema()
+    assert len(list(cache_dir.iterdir())) == 1
+
+    # a warm start skips de-referencing and spec validation
+    schema_registry.clear()
+    with patch.object(StaticSchemaLoader, "process_schema") as mocked_process_schema:
+        assert StaticSchemaLoader(yaml_schema_path).get_schema() == schema
+    mocked_process_schema.assert_not_called()
+
+
+def test_loader_without_content_digest_uses_schema_cache(cache_dir):
+    class LoaderWithoutContentDigest(BaseSchemaLoader):
+        def load_schema(self) -> dict:
+            return StaticSchemaLoader(yaml_schema_path).load_schema()
+
+        def normalize_schema_paths(self, schema: dict) -> dict:
+            return schema
+
+    schema = LoaderWithoutContentDigest().get_schema()
+    assert len(list(cache_dir.iterdir())) == 1
+
+    # the loaded schema is digested instead
+    schema_registry.clear()
+    with patch.object(LoaderWithoutContentDigest, "process_schema") as mocked_process_schema:
+        assert LoaderWithoutContentDigest().get_schema() == schema
+    mocked_process_schema.assert_not_called()
+
+
+def test_loader_rebuilds_corrupted_cache_entries(cache_dir):
+    schema = StaticSchemaLoader(yaml_schema_path).get_schema()
+    (entry,) = cache_dir.iterdir()
+    entry.write_bytes(entry.read_bytes()[:100])
+
+    schema_registry.clear()
+    assert StaticSchemaLoader(yaml_schema_path).get_schema() == schema
+    (rebuilt_entry,) = cache_dir.iterdir()
+    assert SchemaCache(cache_dir).get(StaticSchemaLoader(yaml_schema_path).get_content_digest()) is not None
+    assert rebuilt_entry.stat().st_size > 100
+
+
+def test_cached_schemas_track_referenced_documents(cache_dir, tmp_path):
+    schema_dir = tmp_path / "schemas"
+    schema_dir.mkdir()
+    definitions_path = schema_dir / "definitions.yaml"
+    definitions_path.write_text("Name:\n  type: string\n")
+    schema_path = schema_dir / "schema.yaml"
+    schema_path.write_text("""
+openapi: 3.0.0
+info: {title: Names, version: 1.0.0}
+paths:
+  /names:
+    get:
+      responses:
+        '200':
+          description: names
+          content:
+            application/json:
+              schema:
+                $ref: 'definitions.yaml#/Name'
+""")
+    schema = StaticSchemaLoader(str(schema_path)).get_schema()
+    response_schema = schema["paths"]["/names"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+    assert response_schema == {"type": "string"}
+
+    schema_registry.clear()
+    with patch.object(StaticSchemaLoader, "process_schema") as mocked_process_schema:
+        assert StaticSchemaLoader(str(schema_path)).get_schema() == schema
+    mocked_process_schema.assert_not_called()
+
+    # a changed referenced document invalidates the cached schema
+    definitions_path.write_text("Name:\n  type: integer\n")
+    schema_registry.clear()
+    schema = StaticSchemaLoader(str(schema_path)).get_schema()
+    response_schema = schema["paths"]["/names"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+    assert response_schema == {"type": "integer"}
+
+
+@pytest.mark.parametrize("loader_class", [DrfSpectacularSchemaLoader, DrfYasgSchemaLoader])
+def test_generated_schemas_are_cached_by_code_fingerprint(cache_dir, loader_class):
+    schema = loader_class().get_schema()
+    assert len(list(cache_dir.iterdir())) == 1
+
+    # a warm start skips generating the schema
+    schema_registry.clear()
+    with patch.object(loader_class, "load_schema") as mocked_load_schema:
+        assert loader_class().get_schema() == schema
+    mocked_load_schema.assert_not_called()
+
+
+def test_code_fingerprint(settings, tmp_path):
+    assert [path.name for path in get_project_source_paths()] == ["test_project"]
+    digest = DrfSpectacularSchemaLoader().get_content_digest()
+    assert DrfSpectacularSchemaLoader().get_content_digest() == digest
+    assert DrfYasgSchemaLoader().get_content_digest() != digest
+
+    settings.SPECTACULAR_SETTINGS = {"TITLE": "Changed"}
+    assert DrfSpectacularSchemaLoader().get_content_digest() != digest
+    del settings.SPECTACULAR_SETTINGS
+
+    source_file = tmp_path / "views.py"
+    source_file.write_text("")
+    with patch("openapi_tester.cache.get_project_source_paths", return_value=[tmp_path]):
+        digest = DrfSpectacularSchemaLoader().get_content_digest()
+        source_file.write_text("# changed")
+        assert DrfSpectacularSchemaLoader().get_content_digest() != digest
+
+
+def test_build_schema_cache_command(cache_dir, capsys):
+    call_command(Command())
+    assert len(list(cache_dir.iterdir())) == 1
+    assert "Cached the schema" in capsys.readouterr().out
+
+    with patch.object(DrfSpectacularSchemaLoader, "load_schema") as mocked_load_schema:
+        call_command(Command())
+    mocked_load_schema.assert_not_called()
+    assert "is up to date" in capsys.readouterr().out
+
+    call_command(Command(), schema_file_path=yaml_schema_path)
+    assert len(list(cache_dir.iterdir())) == 2
+
+
+def test_build_schema_cache_command_requires_cache_dir():
+    with pytest.raises(CommandError, match="OPENAPI_TESTER_CACHE_DIR"):
+        call_command(Command())
@@ -1,16 +1,23 @@
 from __future__ import annotations
 
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import Mock, patch
 
 import pytest
+import requests
 
+from openapi_tester import SchemaTester
+from openapi_tester.exceptions import DocumentationError
 from openapi_tester.loaders import (
     DrfSpectacularSchemaLoader,
     DrfYasgSchemaLoader,
     StaticSchemaLoader,
     UrlStaticSchemaLoader,
+    get_session,
+    schema_registry,
 )
-from tests.utils import TEST_ROOT, get_schema_content
+from tests.utils import TEST_ROOT, get_schema_content, response_factory
 
 yaml_schema_path = str(TEST_ROOT) + "/schemas/manual_reference_schema.yaml"
 json_schema_path = str(TEST_ROOT) + "/schemas/manual_reference_schema.json"
@@ -37,8 +44,8 @@ def test_url_schema_loader():
     schema_loader = UrlStaticSchemaLoader(test_schema_url)
     schema_content = get_schema_content(TEST_ROOT / "schemas" / "any_of_one_of_test_schema.yaml")
 
-    with patch("openapi_tester.loaders.requests.get") as mocked_get_request:
-        mocked_get_request.return_value = Mock(content=schema_content)
+    with patch("openapi_tester.loaders.get_session") as mocked_get_session:
+        mocked_get_session.return_value.get.return_value = Mock(content=schema_content, status_code=200)
         loaded_schema = schema_loader.load_schema()
 
     assert type(loaded_schema) == dict
@@ -46,6 +53,13 @@ def test_url_schema_loader():
     assert loaded_schema["info"]["title"] == "Swagger Petstore"
 
 
+def test_loader_normalizes_schema():
+    schema = StaticSchemaLoader(str(TEST_ROOT) + "/schemas/openapi_v3_reference_schema.yaml").get_schema()
+    pet_schema = schema["components"]["schemas"]["Pet"]
+    assert "allOf" not in pet_schema
+    assert sorted(pet_schema["required"]) == ["id", "name"]
+
+
 @pytest.mark.parametrize("loader", loaders)
 def test_loader_get_route(loader):
     assert loader.resolve_path("/api/v1/items/", "get")[0] == "/api/{version}/items"
@@ -73,3 +87,302 @@ def test_static_loader_resolve_nested_route(loader):
         loader.resolve_path("/api/v1/categories/1/subcategories/1/", "get")[0]
         == "/api/{version}/categories/{category_pk}/subcategories/{subcategory_pk}/"
     )
+
+
+def test_schema_registry_shares_loaded_schemas():
+    schema_registry.clear()
+    loader = StaticSchemaLoader(yaml_schema_path, field_key_map={"language": "en"})
+    schema = loader.get_schema()
+    assert len(schema_registry) == 1
+
+    # the same source and field_key_map are served from the registry without loading the schema again
+    other_loader = StaticSchemaLoader(yaml_schema_path, field_key_map={"language": "en"})
+    with patch.object(StaticSchemaLoader, "load_schema") as mocked_load_schema:
+        assert other_loader.get_schema() is schema
+    mocked_load_schema.assert_not_called()
+
+    # a different field_key_map gets its own entry
+    assert StaticSchemaLoader(yaml_schema_path, field_key_map={"language": "nb"}).get_schema() is not schema
+    assert len(schema_registry) == 2
+
+
+def test_schema_registry_cleared_on_setting_changed(settings):
+    StaticSchemaLoader(yaml_schema_path).get_schema()
+    assert len(schema_registry) > 0
+    settings.SPECTACULAR_SETTINGS = {"TITLE": "Changed"}
+    assert len(schema_registry) == 0
+
+
+def test_response_schema_index():
+    loader = StaticSchemaLoader(yaml_schema_path, field_key_map={"language": "en"})
+    schema = loader.get_schema()
+    index = loader.sections.get_response_schema_index(schema)
+    route = schema["paths"]["/api/{version}/cars/correct"]
+    assert index[("/api/{version}/cars/correct", "get", "200")] is (
+        route["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+    )
+    assert loader.sections.get_response_schema_index(schema) is index
+
+    # the index is shared through the schema registry, and cleared with it
+    other_loader = StaticSchemaLoader(yaml_schema_path, field_key_map={"language": "en"})
+    assert other_loader.sections.get_response_schema_index(other_loader.get_schema()) is index
+    schema_registry.clear()
+    assert other_loader.sections.get_response_schema_index(schema) is not index
+
+    # integer status codes are indexed as strings, and a new schema object gets a new index
+    schema = {"swagger": "2.0", "paths": {"/route": {"get": {"responses": {200: {"schema": {"type": "string"}}}}}}}
+    assert loader.sections.get_response_schema_index(schema) == {("/route", "get", "200"): {"type": "string"}}
+
+
+def test_de_referenced_schemas_share_components():
+    loader = StaticSchemaLoader(str(TEST_ROOT) + "/schemas/openapi_v3_reference_schema.yaml")
+    index = loader.sections.get_response_schema_index(loader.get_schema())
+    pet = index[("/pets/{id}", "get", "200")]
+    assert index[("/pets", "get", "200")]["items"] is pet
+    assert index[("/pets", "post", "200")] is pet
+    assert index[("/pets", "get", "default")] is index[("/pets/{id}", "get", "default")]
+
+
+def test_de_referenced_schemas_are_circular(tmp_path):
+    schema_path = tmp_path / "schema.yaml"
+    schema_path.write_text("""
+openapi: 3.0.0
+info: {title: Categories, version: 1.0.0}
+paths:
+  /categories:
+    get:
+      responses:
+        '200':
+          description: categories
+          content:
+            application/json:
+              schema:
+                $ref: '#/components/schemas/Category'
+components:
+  schemas:
+    Category:
+      allOf:
+        - $ref: '#/components/schemas/Named'
+        - type: object
+          properties:
+            children:
+              type: array
+              items:
+                $ref: '#/components/schemas/Category'
+    Named:
+      type: object
+      required: [name]
+      properties:
+        name: {type: string}
+""")
+    loader = StaticSchemaLoader(str(schema_path))
+    category = loader.sections.get_response_schema_index(loader.get_schema())[("/categories", "get", "200")]
+    assert category["required"] == ["name"]
+    assert category["properties"]["children"]["items"] is category
+
+    # responses are validated against circular schemas to any depth
+    schema_tester = SchemaTester(schema_file_path=str(schema_path))
+    grandchild: dict = {"type": "object", "properties": {"name": {"type": "string"}}}
+    child = {
+        "type": "object",
+        "properties": {"name": {"type": "string"}, "children": {"type": "array", "items": grandchild}},
+    }
+    root = {"type": "object", "properties": {"name": {"type": "string"}, "children": {"type": "array", "items": child}}}
+    with patch.object(StaticSchemaLoader, "resolve_path", return_value=("/categories", None)):
+        schema_tester.validate_response(response_factory(root, "/categories", "get"))
+        grandchild["properties"] = {}
+        with pytest.raises(DocumentationError, match='The following property is missing in the response data: "name"'):
+            schema_tester.validate_response(response_factory(root, "/categories", "get"))
+
+
+def test_merged_sections_are_circular(tmp_path):
+    schema_path = tmp_path / "schema.yaml"
+    schema_path.write_text("""
+openapi: 3.0.0
+info: {title: Nodes, version: 1.0.0}
+paths:
+  /nodes:
+    get:
+      responses:
+        '200':
+          description: nodes
+          content:
+            application/json:
+              schema:
+                anyOf:
+                  - type: object
+                    required: [a]
+                    properties:
+                      a: {type: string}
+                      node: {$ref: '#/components/schemas/Node'}
+                  - type: object
+                    required: [b]
+                    properties:
+                      b: {type: string}
+                      node: {$ref: '#/components/schemas/Node'}
+  /named-nodes:
+    get:
+      responses:
+        '200':
+          description: named nodes
+          content:
+            application/json:
+              schema:
+                allOf:
+                  - $ref: '#/components/schemas/Node'
+                  - type: object
+                    properties:
+                      parent: {$ref: '#/components/schemas/Node'}
+                      children:
+                        type: array
+                        items:
+                          $ref: '#/components/schemas/Node'
+components:
+  schemas:
+    Node:
+      type: object
+      required: [name]
+      properties:
+        name: {type: string}
+        children:
+          type: array
+          items:
+            $ref: '#/components/schemas/Node'
+""")
+    schema_tester = SchemaTester(schema_file_path=str(schema_path))
+    # the schema is loaded before resolve_path is patched, so its paths are kept apart
+    schema_tester.loader.get_schema()
+    string: dict = {"type": "string"}
+    node: dict = {"type": "object", "properties": {"name": string}}
+    with patch.object(StaticSchemaLoader, "resolve_path", return_value=("/nodes", None)):
+        # the data spans both anyOf options, so they are merged, along with the circular Node schema they share
+        data = {"type": "object", "properties": {"a": string, "b": string, "node": node}}
+        schema_tester.validate_response(response_factory(data, "/nodes", "get"))
+    with patch.object(StaticSchemaLoader, "resolve_path", return_value=("/named-nodes", None)):
+        schema_tester.validate_response(
+            response_factory({"type": "object", "properties": {"name": string, "parent": node}}, "/named-nodes", "get")
+        )
+        node["properties"]["children"] = {"type": "array", "items": {"type": "object", "properties": {}}}
+        with pytest.raises(DocumentationError, match='The following property is missing in the response data: "name"'):
+            schema_tester.validate_response(
+                response_factory(
+                    {"type": "object", "properties": {"name": string, "parent": node}}, "/named-nodes", "get"
+                )
+            )
+
+
+def test_lazy_references(settings):
+    settings.OPENAPI_TESTER_LAZY_REFERENCES = True
+    loader = StaticSchemaLoader(str(TEST_ROOT) + "/schemas/openapi_v3_reference_schema.yaml")
+    with patch.object(StaticSchemaLoader, "de_reference_schema") as mocked_de_reference_schema:
+        schema = loader.get_schema()
+    mocked_de_reference_schema.assert_not_called()
+
+    # response schemas are indexed, but not resolved up front
+    response_schema = loader.sections.get_response_schema_index(schema)[("/pets", "get", "200")]
+    assert response_schema["items"] == {"$ref": "#/components/schemas/Pet"}
+
+    # they are resolved and normalized when requested, once, and referenced sections are shared
+    resolved = loader.sections.resolve(response_schema)
+    assert loader.sections.resolve(response_schema) is resolved
+    assert resolved["items"]["required"] == ["name", "id"]
+    assert "allOf" not in resolved["items"]
+    assert StaticSchemaLoader(loader.path).sections.resolve(schema["components"]["schemas"]["Pet"]) is resolved["items"]
+
+
+def test_resolve_parameterized_path_is_cached(settings):
+    loader = StaticSchemaLoader(yaml_schema_path, field_key_map={"language": "en"})
+    loader.resolved_path_cache.clear()
+    with patch.object(StaticSchemaLoader, "resolve_path", wraps=loader.resolve_path) as mocked_resolve_path:
+        for _ in range(3):
+            assert loader.resolve_parameterized_path("/api/v1/cars/correct", "get") == "/api/{version}/cars/correct"
+    assert mocked_resolve_path.call_count == 1
+    assert (loader.resolved_path_cache.hits, loader.resolved_path_cache.misses) == (2, 1)
+
+    # loaders with another field_key_map use another cache, and changing the URLconf clears all caches
+    assert StaticSchemaLoader(yaml_schema_path).resolved_path_cache is not loader.resolved_path_cache
+    settings.ROOT_URLCONF = "test_project.urls"
+    assert len(loader.resolved_path_cache) == 0
+
+
+class SchemaRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serves a schema document with an ETag, and answers conditional requests for it.
+    """
+
+    content = get_schema_content(TEST_ROOT / "schemas" / "any_of_one_of_test_schema.yaml")
+    etag = '"v1"'
+    received: list[tuple[str, str | None]] = []
+
+    def do_GET(self):  # noqa: N802
+        if_none_match = self.headers.get("If-None-Match")
+        self.received.append((self.path, if_none_match))
+        if if_none_match == self.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", self.etag)
+        self.send_header("Content-Length", str(len(self.content)))
+        self.end_headers()
+        self.wfile.write(self.content)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def schema_server():
+    SchemaRequestHandler.etag = '"v1"'
+    SchemaRequestHandler.received = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SchemaRequestHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_url_schema_loader_revalidates_cached_schemas(settings, tmp_path, schema_server):
+    settings.OPENAPI_TESTER_CACHE_DIR = str(tmp_path)
+    url = f"http://127.0.0.1:{schema_server.server_port}/schema.yaml"
+    schema = UrlStaticSchemaLoader(url).load_schema()
+    assert schema["info"]["title"] == "Swagger Petstore"
+    assert UrlStaticSchemaLoader(url).load_schema() == schema
+    assert SchemaRequestHandler.received == [("/schema.yaml", None), ("/schema.yaml", '"v1"')]
+
+    # changed documents are downloaded again
+    SchemaRequestHandler.etag = '"v2"'
+    SchemaRequestHandler.received = []
+    assert UrlStaticSchemaLoader(url).load_schema() == schema
+    assert UrlStaticSchemaLoader(url).load_schema() == schema
+    assert SchemaRequestHandler.received == [("/schema.yaml", '"v1"'), ("/schema.yaml", '"v2"')]
+
+    # in offline mode, no requests are made for cached schemas
+    settings.OPENAPI_TESTER_OFFLINE = True
+    SchemaRequestHandler.received = []
+    assert UrlStaticSchemaLoader(url).load_schema() == schema
+    assert SchemaRequestHandler.received == []
+
+
+def test_url_schema_loader_uses_cached_schema_when_offline(settings, tmp_path, schema_server):
+    settings.OPENAPI_TESTER_CACHE_DIR = str(tmp_path)
+    url = f"http://127.0.0.1:{schema_server.server_port}/schema.yaml"
+    schema = UrlStaticSchemaLoader(url).load_schema()
+    schema_server.shutdown()
+    schema_server.server_close()
+
+    with pytest.warns(UserWarning, match=f"Could not download the schema from {url}, using the cached copy"):
+        assert UrlStaticSchemaLoader(url).load_schema() == schema
+    with pytest.raises(requests.ConnectionError):
+        UrlStaticSchemaLoader(url.replace("schema", "other-schema")).load_schema()
+
+
+def test_url_schema_loader_without_cache(schema_server):
+    url = f"http://127.0.0.1:{schema_server.server_port}/schema.yaml"
+    loader = UrlStaticSchemaLoader(url)
+    assert loader.get_schema_source() == url
+    assert loader.load_schema() == loader.load_schema() == UrlStaticSchemaLoader(url).load_schema()
+    # each loader downloads the document once, over a pooled connection
+    assert SchemaRequestHandler.received == [("/schema.yaml", None), ("/schema.yaml", None)]
+    assert get_session() is get_session()
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import json
+from unittest.mock import patch
+
+import pytest
+import yaml
+
+from openapi_tester.loaders import StaticSchemaLoader
+from openapi_tester.parsers import JSON_FORMAT, YAML_FORMAT, parse_json, parse_schema, sniff_format
+from tests.utils import TEST_ROOT
+
+json_schema_path = TEST_ROOT / "schemas" / "manual_reference_schema.json"
+
+
+@pytest.mark.parametrize(
+    "content, expected",
+    [
+        (b'{"openapi": "3.0.0"}', JSON_FORMAT),
+        (b"\xef\xbb\xbf\n  [1, 2]", JSON_FORMAT),
+        ("\ufeff {}", JSON_FORMAT),
+        (b"openapi: 3.0.0", YAML_FORMAT),
+        (b"# {comment}\n{}", YAML_FORMAT),
+        ("", YAML_FORMAT),
+    ],
+)
+def test_sniff_format(content, expected):
+    assert sniff_format(content) == expected
+
+
+@pytest.mark.parametrize("decoder", [json.loads, None])
+def test_parse_json(decoder):
+    with patch("openapi_tester.parsers.JSON_DECODER", decoder):
+        assert parse_json(b'{"a": [1, 2.5, null]}') == {"a": [1, 2.5, None]}
+        # values that third-party decoders can reject are parsed by the json module
+        assert parse_json(b"[%d]" % 2**70) == [2**70]
+        assert parse_json("[NaN]")[0] != parse_json("[NaN]")[0]
+        with pytest.raises(ValueError):
+            parse_json(b'{"a": }')
+
+
+def test_parse_schema():
+    assert parse_schema(b'{"a": 1}') == {"a": 1}
+    # JSON-like YAML
+    assert parse_schema(b"{a: 1, b: [x, y]}") == {"a": 1, "b": ["x", "y"]}
+    with pytest.raises(yaml.YAMLError):
+        parse_schema(b"a: [1")
+    # unsafe tags are rejected
+    with pytest.raises(yaml.YAMLError):
+        parse_schema(b"a: !!python/object/apply:os.system ['true']")
+
+
+def test_parse_schema_keeps_aliases_shared():
+    schema = parse_schema(b"definitions:\n  pet: &pet {type: object}\nanimals:\n  cat: *pet\n  dog: *pet\n")
+    assert schema["animals"]["cat"] is schema["animals"]["dog"] is schema["definitions"]["pet"]
+
+
+def test_static_schema_format_is_detected_from_content(tmp_path):
+    path = tmp_path / "schema.txt"
+    path.write_bytes(json_schema_path.read_bytes())
+    assert StaticSchemaLoader(str(path)).load_schema() == StaticSchemaLoader(str(json_schema_path)).load_schema()
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import pytest
+
+from openapi_tester.exceptions import OpenAPISchemaError
+from openapi_tester.loaders import fetch_reference_document
+from openapi_tester.references import ReferenceResolver
+
+document = {
+    "paths": {
+        "/pets": {"get": {"responses": {"200": {"$ref": "#/components/responses/Pets"}}}},
+        "/pets/{id}": {"get": {"responses": {"200": {"$ref": "#/components/responses/Pet"}}}},
+    },
+    "components": {
+        "responses": {
+            "Pets": {"schema": {"type": "array", "items": {"$ref": "#/components/schemas/Pet"}}},
+            "Pet": {"$ref": "#/components/responses/Pet~1Alias"},
+            "Pet/Alias": {"schema": {"$ref": "#/components/schemas/Pet"}},
+        },
+        "schemas": {
+            "Pet": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "children": {"type": "array", "items": {"$ref": "#/components/schemas/Pet"}},
+                },
+            },
+        },
+    },
+}
+
+
+def test_resolve_shares_referenced_sections():
+    resolver = ReferenceResolver(document)
+    pets = resolver.resolve(document["paths"]["/pets"])
+    pet = resolver.resolve(document["paths"]["/pets/{id}"])
+    pet_schema = pet["get"]["responses"]["200"]["schema"]
+    assert pets["get"]["responses"]["200"]["schema"]["items"] is pet_schema
+    assert pet_schema["properties"]["name"] == {"type": "string"}
+
+    # circular references are resolved to circular structures
+    assert pet_schema["properties"]["children"]["items"] is pet_schema
+
+    # resolved sections are memoized, and the document is left as it is
+    assert resolver.resolve(document["components"]["schemas"]["Pet"]) is pet_schema
+    assert resolver.resolve(pet_schema) is pet_schema
+    assert document["components"]["schemas"]["Pet"]["properties"]["children"]["items"] == {
+        "$ref": "#/components/schemas/Pet"
+    }
+
+
+def test_follow():
+    resolver = ReferenceResolver(document)
+    response, url = resolver.follow(document["paths"]["/pets/{id}"]["get"]["responses"]["200"])
+    assert response is document["components"]["responses"]["Pet/Alias"]
+    assert url is None
+    assert resolver.follow(response) == (response, None)
+
+
+def test_resolve_invalid_references():
+    resolver = ReferenceResolver({"a": {"$ref": "#/b"}, "b": {"$ref": "#/a"}, "c": {"$ref": "#/missing"}})
+    with pytest.raises(OpenAPISchemaError, match="The reference `#/b` leads to a loop of references"):
+        resolver.resolve(resolver.document["a"])
+    with pytest.raises(OpenAPISchemaError, match="Cannot resolve the reference `#/missing`"):
+        resolver.resolve(resolver.document["c"])
+    with pytest.raises(OpenAPISchemaError, match="Cannot load the referenced document `other.yaml`"):
+        resolver.resolve({"$ref": "other.yaml#/a"})
+
+
+def test_resolve_references_to_other_documents(tmp_path):
+    (tmp_path / "definitions.yaml").write_text(
+        "Problem:\n  type: object\n  properties:\n    detail:\n      $ref: '#/Detail'\nDetail:\n  type: string\n"
+    )
+    schema_path = tmp_path / "schema.yaml"
+    resolver = ReferenceResolver({}, url=schema_path.as_uri(), fetch_document=fetch_reference_document)
+    problem = resolver.resolve({"$ref": "definitions.yaml#/Problem"})
+    # references in the other document are relative to that document
+    assert problem == {"type": "object", "properties": {"detail": {"type": "string"}}}
+    assert resolver.resolve({"$ref": f"{(tmp_path / 'definitions.yaml').as_uri()}#/Problem"}) is problem
@@ -0,0 +1,121 @@
+import json
+
+import pytest
+from rest_framework.response import Response
+
+from openapi_tester import SampleAll, SampleEdges, SampleFirst, SampleStride, SchemaTester
+from openapi_tester.exceptions import DocumentationError
+
+tester = SchemaTester()
+
+array_schema = {"type": "array", "items": {"type": "integer"}}
+map_schema = {"type": "object", "additionalProperties": {"type": "integer"}}
+
+
+def test_sampling_policies_select_indices():
+    assert list(SampleAll().select(5)) == [0, 1, 2, 3, 4]
+    assert list(SampleFirst(3).select(10)) == [0, 1, 2]
+    assert list(SampleFirst(3).select(2)) == [0, 1]
+    assert list(SampleStride(4).select(10)) == [0, 4, 8]
+
+    indices = SampleEdges(first=2, last=1, random_count=3, seed=1).select(100)
+    assert len(indices) == 6
+    assert indices[:2] == [0, 1] and indices[-1] == 99
+    assert indices == sorted(indices)
+    # the generator is seeded, so the sample is reproducible
+    assert SampleEdges(first=2, last=1, random_count=3, seed=1).select(100) == indices
+    assert list(SampleEdges(first=2, last=1, random_count=3).select(5)) == [0, 1, 2, 3, 4]
+
+
+def test_sampling_policies_compare_by_value():
+    assert SampleFirst(3) == SampleFirst(3)
+    assert hash(SampleEdges(seed=2)) == hash(SampleEdges(seed=2))
+    assert SampleFirst(3) != SampleStride(3)
+    with pytest.raises(ValueError):
+        SampleStride(0)
+
+
+def test_array_sampling():
+    data = [1] * 1000
+    data[500] = "invalid"
+    with pytest.raises(DocumentationError):
+        tester.test_schema_section(array_schema, data)
+    assert tester.sampling_summary.checked_items == tester.sampling_summary.items == 1000
+
+    tester.test_schema_section(array_schema, data, sampling=SampleFirst(100))
+    assert (tester.sampling_summary.items, tester.sampling_summary.checked_items) == (1000, 100)
+
+    with pytest.raises(DocumentationError):
+        tester.test_schema_section(array_schema, data, sampling=SampleStride(10))
+    tester.test_schema_section(array_schema, data, sampling=SampleStride(7))
+    assert tester.sampling_summary.checked_items == 143
+
+
+def test_additional_properties_sampling():
+    data = {f"key_{i}": i for i in range(100)}
+    data["key_99"] = "invalid"
+    with pytest.raises(DocumentationError):
+        tester.test_schema_section(map_schema, data)
+
+    tester.test_schema_section(map_schema, data, sampling=SampleFirst(10))
+    assert tester.sampling_summary.items == 100
+    assert tester.sampling_summary.checked_items == 10
+
+    with pytest.raises(DocumentationError):
+        tester.test_schema_section(map_schema, data, sampling=SampleEdges(first=1, last=1, random_count=5))
+
+
+def test_validate_response_sampling(monkeypatch):
+    items = [{"id": 1}] * 50
+    schema_section = {
+        "type": "array",
+        "items": {"type": "object", "properties": {"id": {"type": "integer"}, "tags": array_schema}},
+    }
+    monkeypatch.setattr(tester, "get_response_schema_section", lambda response: schema_section)
+    response = Response(status=200, data=items)
+    response.request = {"REQUEST_METHOD": "GET", "PATH_INFO": "/api/v1/items"}
+    response.json = lambda: items
+
+    tester.validate_response(response, sampling=SampleFirst(5))
+    assert str(tester.sampling_summary) == "Checked 5 of 50 items in 1 collections"
+
+    sampled_tester = SchemaTester(sampling=SampleStride(10))
+    monkeypatch.setattr(sampled_tester, "get_response_schema_section", lambda response: schema_section)
+    sampled_tester.validate_response(response)
+    assert sampled_tester.sampling_summary.checked_items == 5
+    assert sampled_tester.sampling_summary.skipped_items == 45
+
+
+def test_sampling_summary_counts_accepted_options_only():
+    strings_schema = {"type": "array", "items": {"type": "string"}}
+    for keyword in ("oneOf", "anyOf"):
+        tester.test_schema_section({keyword: [strings_schema, array_schema]}, [1, 2, 3])
+        assert repr(tester.sampling_summary) == "SamplingSummary(collections=1, items=3, checked_items=3)"
+
+    # options probed while spanning an anyOf are not counted either
+    any_of_schema = {
+        "anyOf": [
+            {"type": "object", "required": ["a"], "properties": {"a": array_schema}},
+            {"type": "object", "required": ["b"], "properties": {"b": strings_schema}},
+        ]
+    }
+    tester.test_schema_section(any_of_schema, {"a": [1, 2], "b": ["x"]})
+    assert repr(tester.sampling_summary) == "SamplingSummary(collections=2, items=3, checked_items=3)"
+
+
+def test_streaming_validation_sampling(monkeypatch):
+    items = [{"id": 1, "tags": [1, 2]}] * 50
+    schema_section = {
+        "type": "array",
+        "items": {"type": "object", "properties": {"id": {"type": "integer"}, "tags": array_schema}},
+    }
+    monkeypatch.setattr(tester, "get_response_schema_section", lambda response: schema_section)
+    response = Response(status=200, data=items)
+    response.request = {"REQUEST_METHOD": "GET", "PATH_INFO": "/api/v1/items"}
+    response.content = json.dumps(items).encode()
+
+    # every item is validated in streaming mode, and counted as such
+    tester.validate_response(response, stream=True)
+    assert str(tester.sampling_summary) == "Checked 150 of 150 items in 51 collections"
+    with pytest.raises(ValueError, match="cannot be applied in streaming mode"):
+        tester.validate_response(response, sampling=SampleFirst(5), stream=True)
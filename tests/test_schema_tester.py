@@ -16,10 +16,13 @@ from openapi_tester import (
     SchemaTester,
     StaticSchemaLoader,
     is_pascal_case,
+    is_snake_case,
 )
+from openapi_tester.compiler import IterativeValidationPlan
 from openapi_tester.constants import (
     INIT_ERROR,
     OPENAPI_PYTHON_MAPPING,
+    VALIDATE_ANY_OF_ERROR,
     VALIDATE_EXCESS_RESPONSE_KEY_ERROR,
     VALIDATE_MISSING_RESPONSE_KEY_ERROR,
     VALIDATE_NONE_ERROR,
@@ -28,6 +31,7 @@ from openapi_tester.constants import (
 )
 from openapi_tester.exceptions import CaseError, DocumentationError, UndocumentedSchemaSectionError
 from openapi_tester.loaders import UrlStaticSchemaLoader
+from openapi_tester.utils import merge_objects
 from test_project.models import Names
 from tests import example_object, example_schema_types
 from tests.utils import TEST_ROOT, iterate_schema, mock_schema, response_factory
@@ -154,6 +158,18 @@ def test_validate_response_failure_scenario_with_predefined_data(client):
             tester.validate_response(response)
 
 
+def test_validate_response_with_lazy_references(client, settings):
+    settings.OPENAPI_TESTER_LAZY_REFERENCES = True
+    schema_tester = SchemaTester()
+    schema_tester.loader = DrfSpectacularSchemaLoader()
+    response = client.get(de_parameterized_path)
+    schema_tester.validate_response(response)
+    assert schema_tester.get_response_schema_section(response) is schema_tester.get_response_schema_section(response)
+    for item in bad_test_data:
+        with pytest.raises(DocumentationError, match='The following property is missing in the response data: "width"'):
+            schema_tester.validate_response(client.get(item["url"]))
+
+
 def test_validate_response_failure_scenario_undocumented_path(monkeypatch):
     schema = deepcopy(tester.loader.get_schema())
     schema_section = schema["paths"][parameterized_path][method]["responses"][status]["content"]["application/json"][
@@ -260,13 +276,10 @@ def test_nullable_validation():
         # Unless the schema specifies it should be nullable
 
         # OpenAPI 3+
-        schema["nullable"] = True
-        tester.test_schema_section(schema, None)
+        tester.test_schema_section({**schema, "nullable": True}, None)
 
         # Swagger 2.0
-        del schema["nullable"]
-        schema["x-nullable"] = True
-        tester.test_schema_section(schema, None)
+        tester.test_schema_section({**schema, "x-nullable": True}, None)
 
 
 def test_write_only_validation():
@@ -281,6 +294,8 @@ def test_write_only_validation():
     }
     test_response = {"test": "testString"}
     tester.test_schema_section(test_schema_section, test_response)
+    # validated sections are compiled once, so they are changed through copies
+    test_schema_section = deepcopy(test_schema_section)
     test_schema_section["properties"]["test"]["writeOnly"] = True
     with pytest.raises(DocumentationError, match=VALIDATE_WRITE_ONLY_RESPONSE_KEY_ERROR.format(write_only_key="test")):
         tester.test_schema_section(test_schema_section, test_response)
@@ -299,6 +314,46 @@ def test_any_of_validation():
         tester.test_schema_section(docs_any_of_example, {"nickname": "Mr. Paws", "hunts": False})
 
 
+def test_any_of_spanning_options_is_validated_once(monkeypatch):
+    any_of_section = {
+        "anyOf": [
+            {"type": "object", "required": [f"key_{i}"], "properties": {f"key_{i}": {"type": "integer"}}}
+            for i in range(12)
+        ]
+    }
+    merges = []
+
+    def counting_merge_objects(dictionaries):
+        merges.append(len(dictionaries))
+        return merge_objects(dictionaries)
+
+    monkeypatch.setattr("openapi_tester.compiler.merge_objects", counting_merge_objects)
+    tester.test_schema_section(any_of_section, {"key_1": 1, "key_5": 5, "key_11": 11})
+    assert merges == [3]
+
+    merges.clear()
+    with pytest.raises(DocumentationError, match=VALIDATE_ANY_OF_ERROR):
+        tester.test_schema_section(any_of_section, {"key_1": 1, "key_5": "5", "key_11": 11})
+    # the option with the invalid value is left out, and the remaining ones don't document its key
+    assert merges == [2]
+
+
+def test_any_of_options_with_conflicting_properties():
+    any_of_section = {
+        "anyOf": [
+            {"type": "object", "required": ["a"], "properties": {"a": {"type": "string"}, "x": {"type": "string"}}},
+            {"type": "object", "required": ["b"], "properties": {"b": {"type": "string"}, "x": {"type": "integer"}}},
+        ]
+    }
+    tester.test_schema_section(any_of_section, {"a": "a", "x": "x"})
+    tester.test_schema_section(any_of_section, {"b": "b", "x": 1})
+    # the second option does not accept the value of x, so the data does not span both options; merging the options
+    # would keep the type of the first option's x, and accept it
+    assert merge_objects(any_of_section["anyOf"])["properties"]["x"] == {"type": "string"}
+    with pytest.raises(DocumentationError, match=VALIDATE_ANY_OF_ERROR):
+        tester.test_schema_section(any_of_section, {"a": "a", "b": "b", "x": "x"})
+
+
 def test_one_of_validation():
     all_types = [
         {"type": "string"},
@@ -453,3 +508,219 @@ def test_custom_validators():
         match=f"Expected uuid1, but received {uid4}",
     ):
         tester_with_custom_validator.test_schema_section(uid1_schema, uid4, validators=[uuid_1_validator])
+
+
+def test_validation_plans_are_cached(client):
+    schema_tester = SchemaTester()
+    response = client.get(de_parameterized_path)
+    schema_section = schema_tester.get_response_schema_section(response)
+    schema_tester.validate_response(response)
+    schema_tester.validate_response(response)
+    plan = schema_tester.get_validation_plan(schema_section)
+    assert len(schema_tester._validation_plans) == 1
+    assert plan.schema_section is schema_section
+
+    # a different configuration gets its own plan
+    case_tested_plan = schema_tester.get_validation_plan(schema_section, case_tester=is_snake_case)
+    assert case_tested_plan is not plan
+    assert schema_tester.get_validation_plan(schema_section, case_tester=is_snake_case) is case_tested_plan
+
+
+def test_schema_sections_are_compiled_once():
+    schema_tester = SchemaTester()
+    schema_section = {"type": "object", "properties": {"key": {"type": "string"}}}
+    schema_tester.test_schema_section(schema_section, {"key": "value"})
+    with patch("openapi_tester.compiler.normalize_schema_section") as mocked_normalize_schema_section:
+        schema_tester.test_schema_section(schema_section, {"key": "value"})
+        schema_tester.test_openapi_object(schema_section, {"key": "value"}, "init")
+    mocked_normalize_schema_section.assert_not_called()
+    assert schema_tester.get_compiler() is schema_tester.get_compiler()
+
+
+def test_validation_plans_follow_tester_configuration():
+    schema_tester = SchemaTester(case_tester=is_snake_case)
+    schema_section = {"type": "object", "properties": {"name": {"type": "string"}}}
+    plan = schema_tester.get_validation_plan(schema_section)
+    with pytest.raises(CaseError):
+        plan.validate({"name": "name", "camelCase": 1})
+
+    # changes to the tester's ignored keys and validators apply to later validations
+    schema_tester.ignore_case = ["camelCase"]
+    schema_section["additionalProperties"] = True
+    schema_tester.get_validation_plan(schema_section).validate({"name": "name", "camelCase": 1})
+    schema_tester.validators = [lambda section, data: "too short" if len(data) < 3 else None]
+    with pytest.raises(DocumentationError, match="too short"):
+        schema_tester.get_validation_plan(schema_section).validate({"name": "x"})
+
+
+def test_validation_plan_only_binds_present_keywords():
+    plan = tester.get_compiler().compile({"type": "string", "maxLength": 5, "pattern": "^a"})
+    bound_validators = [check.func.__name__ for check in plan.checks]
+    assert bound_validators == ["validate_type", "validate_pattern", "validate_max_length"]
+    plan.validate("abc")
+    with pytest.raises(DocumentationError, match="does not match the specified pattern"):
+        plan.validate("bcd")
+
+
+def test_object_key_checks_are_memoized_per_shape():
+    schema_section = {
+        "type": "array",
+        "items": {
+            "type": "object",
+            "required": ["id"],
+            "properties": {"id": {"type": "integer"}, "name": {"type": "string"}},
+        },
+    }
+    data = [{"id": i, "name": "name"} for i in range(50)] + [{"id": i} for i in range(50)]
+    plan = tester.get_compiler().compile(schema_section)
+    plan.validate(data)
+    items_plan = plan.sub_plan(schema_section["items"])
+    assert items_plan._valid_shapes == {frozenset(["id", "name"]), frozenset(["id"])}
+
+    with pytest.raises(DocumentationError, match=VALIDATE_MISSING_RESPONSE_KEY_ERROR.format(missing_key="id")):
+        tester.test_schema_section(schema_section, [*data, {"name": "name"}])
+    with pytest.raises(DocumentationError, match='Received: "1"'):
+        tester.test_schema_section(schema_section, [*data, {"id": "1", "name": "name"}])
+
+
+def test_key_casing_is_tested_once_per_key():
+    checked_keys = []
+    schema_tester = SchemaTester(case_tester=checked_keys.append, ignore_case=["ID"])
+    schema_section = {
+        "type": "object",
+        "properties": {
+            "ID": {"type": "integer"},
+            "name": {"type": "string"},
+            "tags": {"type": "object", "additionalProperties": True},
+        },
+    }
+    data = {"ID": 1, "name": "name", "tags": {"name": "name", "color": "red"}}
+    schema_tester.test_schema_section(schema_section, data)
+    schema_tester.test_schema_section(schema_section, data)
+    schema_tester.test_key_casing("color")
+    assert sorted(checked_keys) == ["color", "name", "tags"]
+
+    with pytest.raises(CaseError):
+        SchemaTester(case_tester=is_pascal_case).test_schema_section(schema_section, data)
+    # failing keys are not remembered
+    with pytest.raises(CaseError):
+        SchemaTester(case_tester=is_pascal_case).test_key_casing("name")
+
+
+def test_schema_casing_is_tested_once_per_section():
+    schema_section = {
+        "type": "array",
+        "items": {
+            "type": "object",
+            "properties": {
+                "id": {"type": "integer"},
+                "owner": {"type": "object", "nullable": True, "properties": {"Name": {"type": "string"}}},
+            },
+        },
+    }
+    compiler = SchemaTester(case_tester=is_snake_case).get_compiler()
+    # property names are tested even when no data reaches them
+    with pytest.raises(CaseError, match="The response key `Name` is not properly snake_cased"):
+        compiler.compile_schema(schema_section)
+    with pytest.raises(CaseError):
+        compiler.compile_schema(schema_section)
+
+    schema_section["items"]["properties"]["owner"]["properties"] = {"name": {"type": "string"}}
+    checked_keys = []
+    compiler = SchemaTester(case_tester=checked_keys.append).get_compiler()
+    plan = compiler.compile_schema(schema_section)
+    assert compiler.compile_schema(schema_section) is plan
+    assert checked_keys == ["id", "owner", "name"]
+    plan.validate([{"id": i, "owner": {"name": "name"}} for i in range(10)])
+    assert checked_keys == ["id", "owner", "name"]
+
+
+def test_iterative_engine():
+    comment_schema = {"type": "object", "required": ["text"], "properties": {"text": {"type": "string"}}}
+    comment_schema["properties"]["replies"] = {"type": "array", "items": comment_schema}
+    thread = {"text": "root", "replies": []}
+    reply = thread
+    for _ in range(5000):
+        reply["replies"].append({"text": "reply", "replies": []})
+        reply = reply["replies"][-1]
+
+    with pytest.raises(RecursionError):
+        tester.test_schema_section(comment_schema, thread)
+    iterative_tester = SchemaTester(engine="iterative")
+    iterative_tester.test_schema_section(comment_schema, thread)
+
+    reply["replies"].append({"text": 1})
+    with pytest.raises(DocumentationError, match='Expected: a "string" type value') as e:
+        iterative_tester.test_schema_section(comment_schema, thread)
+    assert str(e.value).count(".object:key:replies.array.item") == 5001
+
+    iterative_tester.engine = "unknown"
+    with pytest.raises(ValueError, match="Unknown validation engine"):
+        iterative_tester.test_schema_section(comment_schema, thread)
+
+
+def test_engine_setting(settings):
+    settings.OPENAPI_TESTER_ENGINE = "iterative"
+    plan = SchemaTester().get_validation_plan({"type": "string"})
+    assert isinstance(plan, IterativeValidationPlan)
+    # the constructor argument takes precedence over the setting
+    plan = SchemaTester(engine="recursive").get_validation_plan({"type": "string"})
+    assert not isinstance(plan, IterativeValidationPlan)
+
+
+discriminated_pet_schemas = {
+    "Cat": {
+        "type": "object",
+        "required": ["pet_type", "hunts"],
+        "properties": {"pet_type": {"type": "string"}, "hunts": {"type": "boolean"}},
+        "additionalProperties": True,
+    },
+    "Dog": {
+        "type": "object",
+        "required": ["pet_type", "bark"],
+        "properties": {"pet_type": {"type": "string"}, "bark": {"type": "boolean"}},
+        "additionalProperties": True,
+    },
+}
+
+
+def test_one_of_discriminator_dispatch():
+    schema_tester = SchemaTester(schema_file_path=str(TEST_ROOT) + "/schemas/openapi_v3_reference_schema.yaml")
+    schema_tester.loader.schema = {"openapi": "3.0.0", "components": {"schemas": discriminated_pet_schemas}}
+    schema_section = {
+        "oneOf": [discriminated_pet_schemas["Cat"], discriminated_pet_schemas["Dog"]],
+        "discriminator": {"propertyName": "pet_type", "mapping": {"cat": "#/components/schemas/Cat"}},
+    }
+    plan = schema_tester.get_compiler().compile(schema_section)
+    property_name, mapping = plan.discriminator
+    assert property_name == "pet_type"
+    assert mapping["cat"] is schema_section["oneOf"][0]
+    assert mapping["Dog"] is schema_section["oneOf"][1]  # implicit mapping, by component name
+
+    # data that matches both schemas is only tested against the one the discriminator points to
+    plan.validate({"pet_type": "cat", "hunts": True, "bark": True})
+    plan.validate({"pet_type": "Dog", "hunts": True, "bark": True})
+    with pytest.raises(DocumentationError, match='The following property is missing in the response data: "bark"'):
+        plan.validate({"pet_type": "Dog", "hunts": True})
+
+    # unmapped values fall back to testing every option
+    with pytest.raises(DocumentationError, match=VALIDATE_ONE_OF_ERROR.format(matches=2)):
+        plan.validate({"pet_type": "unknown", "hunts": True, "bark": True})
+
+    # options are matched to component schemas by identity, so copies are not mapped
+    copied_options = [deepcopy(discriminated_pet_schemas["Cat"]), deepcopy(discriminated_pet_schemas["Dog"])]
+    assert schema_tester.get_compiler().compile({**schema_section, "oneOf": copied_options}).discriminator is None
+
+
+def test_one_of_discriminator_mapped_by_enum():
+    schema_section = {
+        "oneOf": [
+            {"type": "object", "properties": {"kind": {"type": "string", "enum": ["a"]}, "value": {"type": "string"}}},
+            {"type": "object", "properties": {"kind": {"type": "string", "enum": ["b"]}, "value": {"type": "integer"}}},
+        ],
+        "discriminator": {"propertyName": "kind"},
+    }
+    tester.test_schema_section(schema_section, {"kind": "a", "value": "text"})
+    tester.test_schema_section(schema_section, {"kind": "b", "value": 1})
+    with pytest.raises(DocumentationError, match='Expected: an "integer" type value'):
+        tester.test_schema_section(schema_section, {"kind": "b", "value": "text"})
@@ -0,0 +1,164 @@
+import json
+
+import pytest
+from django.http import StreamingHttpResponse
+from rest_framework.response import Response
+
+from openapi_tester import SchemaTester
+from openapi_tester.constants import VALIDATE_MISSING_RESPONSE_KEY_ERROR, VALIDATE_ONE_OF_ERROR
+from openapi_tester.exceptions import DocumentationError
+from openapi_tester.streaming import (
+    END_ARRAY,
+    END_MAP,
+    MAP_KEY,
+    START_ARRAY,
+    START_MAP,
+    VALUE,
+    JSONTokenizer,
+    StreamingValidator,
+)
+
+tester = SchemaTester()
+
+item_schema = {
+    "type": "object",
+    "required": ["id", "name"],
+    "properties": {
+        "id": {"type": "integer"},
+        "name": {"type": "string", "maxLength": 10},
+        "tags": {"type": "array", "items": {"type": "string"}, "maxItems": 2},
+        "owner": {"oneOf": [{"type": "integer", "nullable": True}, {"type": "string"}]},
+    },
+}
+list_schema = {"type": "array", "items": item_schema}
+
+
+def chunked(data, size=3):
+    body = json.dumps(data).encode()
+    return [body[start : start + size] for start in range(0, len(body), size)]
+
+
+def stream_validate(schema_section, data, size=3):
+    StreamingValidator(tester.get_compiler().compile(schema_section)).validate(chunked(data, size))
+
+
+def test_tokenizer_events():
+    tokenizer = JSONTokenizer()
+    events = []
+    for chunk in chunked({"a": [1, 2.5e3, "xé\\"], "b": {"c": None, "d": True}, "e": -0.5}, size=1):
+        events.extend(tokenizer.feed(chunk))
+    events.extend(tokenizer.close())
+    assert events == [
+        (START_MAP, None),
+        (MAP_KEY, "a"),
+        (START_ARRAY, None),
+        (VALUE, 1),
+        (VALUE, 2.5e3),
+        (VALUE, "xé\\"),
+        (END_ARRAY, None),
+        (MAP_KEY, "b"),
+        (START_MAP, None),
+        (MAP_KEY, "c"),
+        (VALUE, None),
+        (MAP_KEY, "d"),
+        (VALUE, True),
+        (END_MAP, None),
+        (MAP_KEY, "e"),
+        (VALUE, -0.5),
+        (END_MAP, None),
+    ]
+
+
+@pytest.mark.parametrize("document", [b'{"a": 1,}', b"[1 2]", b"[01]", b"tru", b'"abc', b'{"a": 1}}', b"[", b"1 2"])
+def test_tokenizer_rejects_invalid_json(document):
+    tokenizer = JSONTokenizer()
+    with pytest.raises(ValueError, match="Invalid JSON"):
+        for byte in document:
+            tokenizer.feed(bytes([byte]))
+        tokenizer.close()
+
+
+def test_tokenizer_splits_multibyte_characters():
+    tokenizer = JSONTokenizer()
+    body = json.dumps("\U0001f600 €", ensure_ascii=False).encode()
+    events = [event for byte in body for event in tokenizer.feed(bytes([byte]))]
+    assert events + tokenizer.close() == [(VALUE, "\U0001f600 €")]
+
+
+def test_streaming_validation():
+    data = [{"id": i, "name": "name", "tags": ["a"], "owner": None} for i in range(100)]
+    stream_validate(list_schema, data)
+    stream_validate(list_schema, [])
+
+    data[42]["owner"] = 1.5
+    with pytest.raises(DocumentationError, match=VALIDATE_ONE_OF_ERROR.format(matches=0)) as e:
+        stream_validate(list_schema, data)
+    assert "JSON path: $[42].owner" in str(e.value)
+
+    data[42] = {"id": 42}
+    with pytest.raises(DocumentationError, match=VALIDATE_MISSING_RESPONSE_KEY_ERROR.format(missing_key="name")) as e:
+        stream_validate(list_schema, data)
+    assert "JSON path: $[42]" in str(e.value)
+
+
+def test_streaming_validation_reports_first_failure():
+    data = [{"id": 1, "name": "name", "tags": ["a", "b", "c"]}, {"id": "2", "name": "name"}]
+    with pytest.raises(DocumentationError, match="exceeds the specified maximum length of 2") as e:
+        stream_validate(list_schema, data, size=1)
+    assert "JSON path: $[0].tags" in str(e.value)
+    assert "Reference: init.array.item.object:key:tags" in str(e.value)
+
+    data[0]["tags"] = []
+    with pytest.raises(DocumentationError, match='Expected: an "integer" type value') as e:
+        stream_validate(list_schema, data)
+    assert "JSON path: $[1].id" in str(e.value)
+
+
+def test_validate_streaming_response(monkeypatch):
+    data = [{"id": i, "name": "name"} for i in range(10)]
+    monkeypatch.setattr(tester, "get_response_schema_section", lambda response: list_schema)
+    response = StreamingHttpResponse(chunked(data, size=7), content_type="application/json")
+    response.request = {"REQUEST_METHOD": "GET", "PATH_INFO": "/api/v1/items"}
+    tester.validate_response(response)
+
+    data[-1]["name"] = "a very long name"
+    response = StreamingHttpResponse(chunked(data, size=7), content_type="application/json")
+    response.request = {"REQUEST_METHOD": "GET", "PATH_INFO": "/api/v1/items"}
+    with pytest.raises(DocumentationError, match=r"JSON path: \$\[9\].name"):
+        tester.validate_response(response)
+
+
+def test_streaming_validation_applies_custom_validators(monkeypatch):
+    def fail_objects(schema_section, data):
+        return "objects are not allowed" if isinstance(data, dict) else None
+
+    data = {"id": 1, "name": "name"}
+    monkeypatch.setattr(tester, "get_response_schema_section", lambda response: item_schema)
+    response = StreamingHttpResponse(chunked(data), content_type="application/json")
+    response.request = {"REQUEST_METHOD": "GET", "PATH_INFO": "/api/v1/items/1"}
+    with pytest.raises(DocumentationError, match="objects are not allowed"):
+        tester.validate_response(response, validators=[fail_objects])
+
+    def fail_long_arrays(schema_section, data):
+        return "too many items" if isinstance(data, list) and len(data) > 1 else None
+
+    schema_tester = SchemaTester(validators=[fail_long_arrays])
+    monkeypatch.setattr(
+        schema_tester, "get_response_schema_section", lambda response: {"type": "array", "items": {"type": "integer"}}
+    )
+    response = StreamingHttpResponse(chunked([1, 2]), content_type="application/json")
+    response.request = {"REQUEST_METHOD": "GET", "PATH_INFO": "/api/v1/numbers"}
+    with pytest.raises(DocumentationError, match="too many items"):
+        schema_tester.validate_response(response)
+    response = StreamingHttpResponse(chunked([1]), content_type="application/json")
+    response.request = {"REQUEST_METHOD": "GET", "PATH_INFO": "/api/v1/numbers"}
+    schema_tester.validate_response(response)
+
+
+def test_validate_response_in_streaming_mode(monkeypatch):
+    data = [{"id": 1, "name": "name"}]
+    monkeypatch.setattr(tester, "get_response_schema_section", lambda response: list_schema)
+    response = Response(status=200, data=data)
+    response.request = {"REQUEST_METHOD": "GET", "PATH_INFO": "/api/v1/items"}
+    response.content = json.dumps(data).encode()
+    tester.validate_response(response, stream=True)
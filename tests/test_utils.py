@@ -1,4 +1,12 @@
-from openapi_tester.utils import merge_objects
+import json
+from collections import OrderedDict
+from decimal import Decimal
+from enum import IntEnum
+
+import pytest
+from django.utils.translation import gettext_lazy
+
+from openapi_tester.utils import LRUCache, merge_objects, normalize_schema_section, render_reference, to_plain_data
 from tests.utils import sort_object
 
 object_1 = {"type": "object", "required": ["key1"], "properties": {"key1": {"type": "string"}}}
@@ -30,3 +38,69 @@ def test_merge_objects():
         "properties": {"key1": {"type": "string"}, "key2": {"type": "string"}},
     }
     assert sort_object(merge_objects(test_schemas)) == sort_object(expected)
+
+
+def test_normalize_schema_section_does_not_copy_normalized_sections():
+    assert normalize_schema_section(object_1) is object_1
+
+    schema = {"type": "array", "items": {"allOf": [object_1, object_2]}, "example": {"type": "object"}}
+    normalized = normalize_schema_section(schema)
+    assert sort_object(normalized["items"]) == sort_object(merged_object)
+    assert normalized["example"] is schema["example"]
+    assert "allOf" in schema["items"]  # the input is left untouched
+
+
+def test_normalize_schema_section_memoizes_shared_sections():
+    shared = {"allOf": [object_1, object_2]}
+    memo: dict = {}
+    first = normalize_schema_section({"type": "object", "properties": {"a": shared}}, memo)
+    second = normalize_schema_section({"type": "object", "properties": {"b": shared}}, memo)
+    assert first["properties"]["a"] is second["properties"]["b"]
+    assert normalize_schema_section(first["properties"]["a"], memo) is first["properties"]["a"]
+
+
+def test_lru_cache():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now the least recently used entry
+    cache.set("c", 3)
+    assert "b" not in cache
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert (len(cache), cache.hits, cache.misses) == (2, 3, 1)
+    cache.clear()
+    assert (len(cache), cache.hits, cache.misses) == (0, 0, 0)
+
+
+def test_render_reference():
+    assert render_reference("init") == "init"
+    item_reference = ("init", ".array.item")
+    assert render_reference(item_reference) == "init.array.item"
+    assert (
+        render_reference(((item_reference, ".object:key:", "pets"), ".oneOf"))
+        == "init.array.item.object:key:pets.oneOf"
+    )
+
+
+def test_to_plain_data():
+    shared = OrderedDict([("type", "string"), ("description", gettext_lazy("A description"))])
+    generated = OrderedDict(
+        [
+            ("paths", {"/items": {"responses": {200: shared, "default": shared}}}),
+            ("tags", ("a", "b")),
+            ("flags", {True: 1.5, None: [None, False, IntEnum("Number", "one")(1)]}),
+        ]
+    )
+    data = to_plain_data(generated)
+    assert data == json.loads(json.dumps(generated, default=str))
+    assert type(data) is dict and type(data["tags"]) is list
+    assert type(data["paths"]["/items"]["responses"]["200"]["description"]) is str
+    assert type(data["flags"]["null"][2]) is int
+    responses = data["paths"]["/items"]["responses"]
+    assert responses["200"] is responses["default"]
+
+    with pytest.raises(TypeError, match="Object of type Decimal is not JSON serializable"):
+        to_plain_data({"value": Decimal("1.5")})
+    with pytest.raises(TypeError, match="Keys must be str, int, float, bool or None, not tuple"):
+        to_plain_data({(1, 2): "value"})